@@ -23,7 +23,7 @@ class ActionNotFoundError(Exception):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class _BaseAction:
     """Base class for callback actions."""
 
@@ -33,7 +33,7 @@ class _BaseAction:
     cause: Cause
 
 
-@dataclass
+@dataclass(slots=True)
 class RxAction(_BaseAction):
     """Execution of a subscription callback at a ROS node."""
 
@@ -59,7 +59,7 @@ class RxAction(_BaseAction):
                f"approx_time_sync={self.is_approximate_time_synced})"
 
 
-@dataclass
+@dataclass(slots=True)
 class TimerCallbackAction(_BaseAction):
     """Execution of a timer callback at a ROS node."""
 
@@ -72,13 +72,13 @@ class TimerCallbackAction(_BaseAction):
         return self.cause.period
 
 
-@dataclass
+@dataclass(slots=True)
 class DataProviderInputAction:
     state: ActionState
     published_topic: str
 
 
-@dataclass
+@dataclass(slots=True)
 class OrchestratorBufferAction:
     """
     Dummy action to enable waiting for an output without actually triggering any other actions.
@@ -88,7 +88,7 @@ class OrchestratorBufferAction:
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class OrchestratorStatusAction:
     pass
 
@@ -0,0 +1,102 @@
+# pyright: strict
+
+from typing import AbstractSet, Any, Dict, Generator, Iterable, List, Set, Tuple
+from typing_extensions import TypeAlias
+
+from orchestrator.orchestrator_lib.action import Action, EdgeType
+
+GraphNodeId: TypeAlias = int
+
+
+class ActionGraph:
+    """
+    Directed graph of actions with typed edges.
+
+    An edge u -> v means that action u can not be executed before action v is complete.
+    Multiple edges of different type may exist between the same pair of actions.
+    """
+
+    __slots__ = ("actions", "_succ", "_pred")
+
+    def __init__(self) -> None:
+        self.actions: Dict[GraphNodeId, Action] = {}
+        """Actions by graph node ID"""
+
+        # Edge types by target by source, and by source by target. Both contain the same set object per edge.
+        self._succ: Dict[GraphNodeId, Dict[GraphNodeId, Set[EdgeType]]] = {}
+        self._pred: Dict[GraphNodeId, Dict[GraphNodeId, Set[EdgeType]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def add_node(self, node: GraphNodeId, action: Action) -> None:
+        if node in self.actions:
+            raise KeyError(f"Node {node} already exists")
+        self.actions[node] = action
+        self._succ[node] = {}
+        self._pred[node] = {}
+
+    def remove_node(self, node: GraphNodeId) -> List[GraphNodeId]:
+        """
+        Remove a node and all of its incoming and outgoing edges.
+
+        :return: The former predecessors which have no outgoing edges anymore
+        """
+        del self.actions[node]
+        for v in self._succ.pop(node):
+            del self._pred[v][node]
+        unconstrained: List[GraphNodeId] = []
+        for u in self._pred.pop(node):
+            successors = self._succ[u]
+            del successors[node]
+            if not successors:
+                unconstrained.append(u)
+        return unconstrained
+
+    def add_edge(self, u: GraphNodeId, v: GraphNodeId, edge_type: EdgeType) -> None:
+        edge_types = self._succ[u].get(v)
+        if edge_types is None:
+            new_edge_types: Set[EdgeType] = {edge_type}
+            self._succ[u][v] = new_edge_types
+            self._pred[v][u] = new_edge_types
+        else:
+            edge_types.add(edge_type)
+
+    def has_edge(self, u: GraphNodeId, v: GraphNodeId) -> bool:
+        return v in self._succ[u]
+
+    def has_edge_of_type(self, u: GraphNodeId, v: GraphNodeId, edge_type: EdgeType) -> bool:
+        edge_types = self._succ[u].get(v)
+        return edge_types is not None and edge_type in edge_types
+
+    def edge_types(self, u: GraphNodeId, v: GraphNodeId) -> AbstractSet[EdgeType]:
+        """Types of all edges from u to v, empty if there is none."""
+        return self._succ[u].get(v, frozenset())
+
+    def successors(self, node: GraphNodeId) -> Iterable[GraphNodeId]:
+        return self._succ[node].keys()
+
+    def predecessors(self, node: GraphNodeId) -> Iterable[GraphNodeId]:
+        return self._pred[node].keys()
+
+    def out_degree(self, node: GraphNodeId) -> int:
+        """Number of nodes this node has edges to."""
+        return len(self._succ[node])
+
+    def edges(self) -> Generator[Tuple[GraphNodeId, GraphNodeId, EdgeType], None, None]:
+        for u, targets in self._succ.items():
+            for v, edge_types in targets.items():
+                for edge_type in edge_types:
+                    yield u, v, edge_type
+
+    def to_networkx(self) -> Any:
+        """Copy of this graph as networkx MultiDiGraph, with node attribute "data" and edge attribute "edge_type"."""
+        # networkx is only required for plotting
+        import networkx as nx
+
+        graph: "nx.MultiDiGraph[GraphNodeId]" = nx.MultiDiGraph()
+        for node, action in self.actions.items():
+            graph.add_node(node, data=action)
+        for u, v, edge_type in self.edges():
+            graph.add_edge(u, v, edge_type=edge_type)
+        return graph
@@ -7,17 +7,17 @@ from typing import Union, Tuple, List, Optional, Any
 from typing_extensions import TypeAlias
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, frozen=True)
 class TopicInput:
     input_topic: str
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, frozen=True)
 class TimerInput:
     period: int  # Timer period in ns
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, frozen=True)
 class TimeSyncInfo:
     input_topics: Tuple[str, ...]
     slop: float
@@ -27,17 +27,17 @@ class TimeSyncInfo:
 Cause: TypeAlias = Union[TopicInput, TimerInput]
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, frozen=True)
 class TopicPublish:
     output_topic: str
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, frozen=True)
 class StatusPublish:
     pass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ServiceCall:
     service_name: str
 
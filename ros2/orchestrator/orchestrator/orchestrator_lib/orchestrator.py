@@ -1,21 +1,24 @@
 # pyright: basic
 
 import datetime
+import functools
+import heapq
+import itertools
 from dataclasses import dataclass
 from collections import defaultdict
-from typing import Any, Generator, Tuple, cast, Union, Optional, List, Dict, Set, Iterable, Text, Callable
+from typing import AbstractSet, Any, FrozenSet, Generator, Tuple, cast, Union, Optional, List, Dict, Set, Text, Callable
 
 from rclpy.client import Client
 from rclpy.service import Service
-from typing_extensions import TypeAlias
 
 from std_srvs.srv import Trigger
 
 from orchestrator.orchestrator_lib.model_loader import load_models, load_launch_config, load_launch_config_schema, \
     load_node_config_schema
-from orchestrator.orchestrator_lib.node_model import Cause, NodeModel, ServiceCall, StatusPublish, TimeSyncInfo, \
-    TimerInput, TopicInput, TopicPublish
+from orchestrator.orchestrator_lib.node_model import Cause, Effect, NodeModel, ServiceCall, StatusPublish, \
+    TimeSyncInfo, TimerInput, TopicInput, TopicPublish
 from orchestrator.orchestrator_lib.name_utils import NodeName, TopicName, intercepted_name, normalize_topic_name
+from orchestrator.orchestrator_lib.action_graph import ActionGraph, GraphNodeId
 from orchestrator.orchestrator_lib.action import ActionNotFoundError, ActionState, DataProviderInputAction, EdgeType, \
     RxAction, TimerCallbackAction, Action, OrchestratorBufferAction, OrchestratorStatusAction, CallbackAction
 from orchestrator.orchestrator_lib.ros_utils.logger import lc
@@ -29,42 +32,61 @@ import rclpy
 from rclpy.task import Future
 from rclpy.node import Node as RosNode
 from rclpy.subscription import Subscription
+from rclpy.guard_condition import GuardCondition
 from rclpy.publisher import Publisher
 from rclpy.impl.rcutils_logger import RcutilsLogger
 from rclpy.time import Time
 from rclpy.clock import ClockType
+from rclpy.logging import LoggingSeverity
 from rclpy.executors import Executor
 
-import networkx as nx
-import matplotlib.pyplot as plt
-
 import rosgraph_msgs.msg
 
-GraphNodeId: TypeAlias = int
+
+_CLOCK_TOPIC: TopicName = normalize_topic_name("clock")
 
 
-def _next_id() -> GraphNodeId:
-    n = _next_id.value
-    _next_id.value += 1
-    return n
+# Generates unique, increasing graph node IDs
+_next_id: Callable[[], GraphNodeId] = itertools.count().__next__
 
 
-_next_id.value = 0
+@functools.lru_cache(maxsize=None)
+def _topic_input(topic: TopicName) -> TopicInput:
+    """Shared TopicInput instance for the topic, to avoid creating a new cause object for every input"""
+    return TopicInput(topic)
 
 
 # Inputs always correspond to current simulator time
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FutureInput:
     topic: TopicName
     future: Future
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FutureTimestep:
     time: Time
     future: Future
 
 
+@dataclass(slots=True, frozen=True)
+class _TopicOutputPlan:
+    input: TopicInput
+    """Input caused by the published topic"""
+    receivers: Tuple[Tuple[NodeName, bool], ...]
+    """Receiving nodes, with flag indicating an approximate-time-synced input"""
+
+
+@dataclass(slots=True, frozen=True)
+class _EffectPlan:
+    """Effects of a callback, prepared for adding the caused actions to the graph"""
+    published_topics: Tuple[TopicName, ...]
+    services: FrozenSet[str]
+    """Services provided by the node or called by the callback"""
+    outputs: Tuple[Union[_TopicOutputPlan, StatusPublish], ...]
+    """Topic and status outputs, in order of the modelled effects"""
+
+
 def _verify_node_models(node_models):
     for model in node_models:
         timer_outputs = []
@@ -110,6 +132,20 @@ class Orchestrator:
         self.node_models: List[NodeModel] = node_config
         _verify_node_models(self.node_models)
 
+        # Lookup tables derived from node_models, rebuilt by __update_node_model_indices
+        self.node_models_by_name: Dict[NodeName, NodeModel] = {}
+        self.receivers_by_input_topic: Dict[TopicName, Tuple[Tuple[NodeName, bool], ...]] = {}
+        """Nodes receiving each topic in model order, with flag indicating an approximate-time-synced input"""
+        self.node_models_by_provided_service: Dict[str, NodeModel] = {}
+        self.possible_inputs_by_node: Dict[NodeName, FrozenSet[Cause]] = {}
+        self.timer_inputs: List[Tuple[NodeName, TimerInput]] = []
+        self.reconfiguring_inputs: Set[Tuple[NodeName, Cause]] = set()
+        self.provider_state_modifying_inputs: Set[Tuple[NodeName, Cause]] = set()
+        self.called_services_by_input: Dict[Tuple[NodeName, Cause], Tuple[str, ...]] = {}
+        self.effects_cache: Dict[Tuple[NodeName, Cause], Tuple[Effect, ...]] = {}
+        self.effect_plans: Dict[Tuple[NodeName, Cause], _EffectPlan] = {}
+        self.__update_node_model_indices()
+
         self.__create_subscription_lists()
 
         # Offered input by the data source, which can be requested by completing the contained future
@@ -130,17 +166,52 @@ class Orchestrator:
         #  shall be requested.
         self.simulator_time: Optional[Time] = None
 
-        self.graph: nx.MultiDiGraph = nx.MultiDiGraph()
+        self.graph: ActionGraph = ActionGraph()
+
+        # Removed RxActions, for reuse by __create_rx_action
+        self.rx_action_pool: List[RxAction] = []
+
+        # Indices over the graph nodes, to avoid iterating over the entire graph in lookups.
+        # Only modify the graph via __add_graph_node, __remove_graph_node and __set_state to keep these up to date.
+        # Callback actions (RxAction and TimerCallbackAction) by node name
+        self.callback_actions_by_node: defaultdict[NodeName, Set[GraphNodeId]] = defaultdict(set)
+        # RxActions by input topic
+        self.rx_actions_by_topic: defaultdict[TopicName, Set[GraphNodeId]] = defaultdict(set)
+        # OrchestratorBufferActions by buffered topic
+        self.buffer_actions_by_topic: defaultdict[TopicName, Set[GraphNodeId]] = defaultdict(set)
+        # Callback actions and DataProviderInputActions by state
+        self.actions_by_state: Dict[ActionState, Set[GraphNodeId]] = {state: set() for state in ActionState}
+        # Running callback actions by node name
+        self.running_actions_by_node: defaultdict[NodeName, Set[GraphNodeId]] = defaultdict(set)
+        # Running callback and DataProviderInputActions by topics they (may) publish
+        self.running_actions_by_published_topic: defaultdict[TopicName, Set[GraphNodeId]] = defaultdict(set)
+        # Ready callback actions without ordering constraints (no outgoing edges), which can be executed immediately
+        self.ready_actions: Set[GraphNodeId] = set()
+        # Min-heap of IDs in ready_actions, which may additionally contain IDs which are not ready anymore
+        self.ready_queue: List[GraphNodeId] = []
+        # Waiting TimerCallbackActions by timestamp in nanoseconds. Contains no empty sets.
+        self.waiting_timer_actions_by_time: Dict[int, Set[GraphNodeId]] = {}
+        # Parent of each action with a causality edge, and the inverse. Every action has at most one causality parent.
+        self.causality_parents: Dict[GraphNodeId, GraphNodeId] = {}
+        self.causality_childs: Dict[GraphNodeId, Set[GraphNodeId]] = {}
+        # Callback actions by the services they call
+        self.callback_actions_by_called_service: defaultdict[str, Set[GraphNodeId]] = defaultdict(set)
+        # Callback actions which may cause reconfiguration
+        self.reconfiguring_actions: Set[GraphNodeId] = set()
+        # Callback actions which modify the data providers state
+        self.provider_state_modifying_actions: Set[GraphNodeId] = set()
 
         def debug_service_cb(_request: Trigger.Request, response: Trigger.Response) -> Trigger.Response:
             response.success = True
-            response.message = f"Nodes: {self.graph.nodes(data=True)}"
+            response.message = f"Nodes: {list(self.graph.actions.items())}"
             return response
 
         self.debug_service: Service = self.ros_node.create_service(Trigger, "~/get_debug", debug_service_cb)
 
         self.status_subscription: Subscription = self.ros_node.create_subscription(
             Status, "status", self.__status_callback, 10)
+        # Resolved status topic name without leading slash, for comparison with topics passed to dataprovider_publish
+        self.status_topic_name: str = self.status_subscription.topic_name.removeprefix("/")
         # Server to announce reconfig at
         self.reconfig_announce_service: Service = self.ros_node.create_service(
             ReconfigurationAnnouncement,
@@ -154,6 +225,12 @@ class Orchestrator:
 
         self.pending_reconfiguration = False
 
+        # Graph processing after receiving messages is deferred until the executor has handled all currently
+        # available messages, see __schedule_process
+        self.process_guard_condition: GuardCondition = self.ros_node.create_guard_condition(
+            self.__scheduled_process_callback)
+        self.process_scheduled: bool = False
+
         self.ignore_next_input_from_topic: defaultdict[TopicName, bool] = defaultdict(bool)
 
     def __reconfiguration_announcement_callback(self, _request: ReconfigurationAnnouncement.Request,
@@ -171,6 +248,77 @@ class Orchestrator:
         for node in self.node_models:
             node.dump_state_sequence()
 
+    def __update_node_model_indices(self):
+        """Rebuild the lookup tables which are derived from the node models"""
+        self.node_models_by_name = {node_model.get_name(): node_model for node_model in self.node_models}
+        self.receivers_by_input_topic = {}
+        self.node_models_by_provided_service = {}
+        self.possible_inputs_by_node = {}
+        self.timer_inputs = []
+        self.reconfiguring_inputs = set()
+        self.provider_state_modifying_inputs = set()
+        self.called_services_by_input = {}
+        self.effects_cache = {}
+        self.effect_plans = {}
+        for node_model in self.node_models:
+            possible_inputs = frozenset(node_model.get_possible_inputs())
+            self.possible_inputs_by_node[node_model.get_name()] = possible_inputs
+            for input_cause in possible_inputs:
+                if node_model.input_may_cause_reconfiguration(input_cause):
+                    self.reconfiguring_inputs.add((node_model.get_name(), input_cause))
+                if node_model.input_modifies_dataprovider_state(input_cause):
+                    self.provider_state_modifying_inputs.add((node_model.get_name(), input_cause))
+                called_services = tuple(effect.service_name for effect in node_model.effects_for_input(input_cause)
+                                        if isinstance(effect, ServiceCall))
+                if called_services:
+                    self.called_services_by_input[(node_model.get_name(), input_cause)] = called_services
+                if isinstance(input_cause, TopicInput):
+                    receiver = (node_model.get_name(), node_model.time_sync_info(input_cause.input_topic) is not None)
+                    self.receivers_by_input_topic[input_cause.input_topic] = \
+                        self.receivers_by_input_topic.get(input_cause.input_topic, ()) + (receiver,)
+            # Iterate in model order to keep timer action insertion deterministic
+            for input_cause in node_model.get_possible_inputs():
+                if isinstance(input_cause, TimerInput):
+                    self.timer_inputs.append((node_model.get_name(), input_cause))
+            for service in node_model.get_provided_services():
+                self.node_models_by_provided_service.setdefault(service, node_model)
+
+    def __effects_for_input(self, node_name: NodeName, cause: Cause) -> Tuple[Effect, ...]:
+        """Memoized effects_for_input of the model of the specified node"""
+        key = (node_name, cause)
+        effects = self.effects_cache.get(key)
+        if effects is None:
+            effects = tuple(self.__node_model_by_name(node_name).effects_for_input(cause))
+            self.effects_cache[key] = effects
+        return effects
+
+    def __effect_plan(self, node_name: NodeName, cause: Cause) -> _EffectPlan:
+        """Memoized _EffectPlan for the input of the specified node"""
+        key = (node_name, cause)
+        plan = self.effect_plans.get(key)
+        if plan is not None:
+            return plan
+
+        effects = self.__effects_for_input(node_name, cause)
+        assert len(effects) > 0
+        services = set(self.__node_model_by_name(node_name).get_provided_services())
+        outputs: List[Union[_TopicOutputPlan, StatusPublish]] = []
+        for effect in effects:
+            if isinstance(effect, TopicPublish):
+                receivers = self.receivers_by_input_topic.get(effect.output_topic, ())
+                outputs.append(_TopicOutputPlan(_topic_input(effect.output_topic), receivers))
+            elif isinstance(effect, StatusPublish):
+                outputs.append(effect)
+            elif isinstance(effect, ServiceCall):
+                services.add(effect.service_name)
+        plan = _EffectPlan(
+            # Without duplicates, to add same-topic edges only once per topic
+            tuple(dict.fromkeys(effect.output_topic for effect in effects if isinstance(effect, TopicPublish))),
+            frozenset(services),
+            tuple(outputs))
+        self.effect_plans[key] = plan
+        return plan
+
     def __create_subscription_lists(self):
         """
         Initialize attributes for config-specific stuff: subscriptions, publishers, models of time-sync nodes.
@@ -194,59 +342,65 @@ class Orchestrator:
         this will wait for it and spin the node while waiting.
         """
 
-        def intercept_topic(canonical_name: TopicName, node: NodeModel):
-            intercepted_topic_name = intercepted_name(
-                node.get_name(), canonical_name)
-            canonical_name = normalize_topic_name(canonical_name)
-            lc(self.l, f"Intercepted input \"{canonical_name}\" "
-                       f" from node \"{node.get_name()}\" as \"{intercepted_topic_name}\"")
-
-            # Wait until subscriber exists, get type
-            TopicType = wait_for_node_sub(intercepted_topic_name, node.get_name(), self.l, self.ros_node, self.executor)
-
-            # Subscribe to the input topic
-            if canonical_name not in self.interception_subs:
-                self.l.info(f"  Subscribing to \"{canonical_name}\"")
-
-                self.topic_types[canonical_name] = TopicType
-                subscription = self.ros_node.create_subscription(
-                    TopicType, canonical_name,
-                    lambda msg, topic_name=canonical_name: self.__interception_subscription_callback(
-                        topic_name, cast(Union[rosgraph_msgs.msg.Clock, bytes], msg)),
-                    10, raw=(TopicType != rosgraph_msgs.msg.Clock))
-                self.interception_subs[canonical_name] = subscription
-            else:
-                self.l.info(f"  Subscription for {canonical_name} already exists")
-
-            # Create separate publisher for each node
-            self.l.info(f"  Creating publisher for {intercepted_topic_name}")
-            publisher = self.ros_node.create_publisher(
-                TopicType, intercepted_topic_name, 10)
-            if node.get_name() not in self.interception_pubs:
-                self.interception_pubs[node.get_name()] = {}
-            self.interception_pubs[node.get_name()][canonical_name] = publisher
-
+        # Nodes receiving each intercepted topic, in order of the node models
+        intercepted_inputs: Dict[TopicName, List[NodeModel]] = {}
         for node_model in self.node_models:
             for input_cause in node_model.get_possible_inputs():
                 if isinstance(input_cause, TopicInput):
-                    intercept_topic(input_cause.input_topic, node_model)
+                    canonical_name = normalize_topic_name(input_cause.input_topic)
                 elif isinstance(input_cause, TimerInput):
-                    intercept_topic(normalize_topic_name("clock"), node_model)
+                    canonical_name = _CLOCK_TOPIC
+                else:
+                    continue
+                receiving_nodes = intercepted_inputs.setdefault(canonical_name, [])
+                # Multiple timers of one node share the clock input
+                if node_model not in receiving_nodes:
+                    receiving_nodes.append(node_model)
+
+        for canonical_name, receiving_nodes in intercepted_inputs.items():
+            for node in receiving_nodes:
+                intercepted_topic_name = intercepted_name(node.get_name(), canonical_name)
+
+                # Wait until subscriber exists, get type
+                TopicType = wait_for_node_sub(intercepted_topic_name, node.get_name(), self.l, self.ros_node,
+                                              self.executor)
+
+                # Subscribe to the input topic, once for all receiving nodes
+                new_subscription = canonical_name not in self.interception_subs
+                if new_subscription:
+                    self.topic_types[canonical_name] = TopicType
+                    if canonical_name == _CLOCK_TOPIC:
+                        callback = self.__clock_subscription_callback
+                    else:
+                        callback = functools.partial(self.__interception_subscription_callback, canonical_name)
+                    subscription = self.ros_node.create_subscription(
+                        TopicType, canonical_name, callback,
+                        10, raw=(TopicType != rosgraph_msgs.msg.Clock))
+                    self.interception_subs[canonical_name] = subscription
+
+                # Create separate publisher for each node
+                publisher = self.ros_node.create_publisher(
+                    TopicType, intercepted_topic_name, 10)
+                self.interception_pubs.setdefault(node.get_name(), {})[canonical_name] = publisher
 
+                lc(self.l, f"Intercepted input \"{canonical_name}\" ({TopicType.__name__}) "
+                           f"from node \"{node.get_name()}\" as \"{intercepted_topic_name}\", "
+                           f"{'new' if new_subscription else 'existing'} subscription")
+
+        for node_model in self.node_models:
+            for input_cause in node_model.get_possible_inputs():
                 for effect in node_model.effects_for_input(input_cause):
-                    self.l.info(f" This causes the effect {effect}")
                     if isinstance(effect, TopicPublish):
                         if effect.output_topic not in self.interception_subs:
                             self.l.info(
-                                f"  Subscribing to output topic: {effect.output_topic}")
+                                f" Input {input_cause} of node \"{node_model.get_name()}\" causes output "
+                                f"{effect.output_topic}, subscribing")
                             TopicType = wait_for_topic(effect.output_topic, self.l, self.ros_node, self.executor)
                             self.topic_types[effect.output_topic] = TopicType
                             sub = self.ros_node.create_subscription(
                                 TopicType,
                                 effect.output_topic,
-                                lambda msg,
-                                       topic_name=effect.output_topic: self.__interception_subscription_callback(
-                                    topic_name, cast(Union[rosgraph_msgs.msg.Clock, bytes], msg)),
+                                functools.partial(self.__interception_subscription_callback, effect.output_topic),
                                 10, raw=(TopicType != rosgraph_msgs.msg.Clock))
                             self.interception_subs[effect.output_topic] = sub
                             wait_for_node_pub(
@@ -288,11 +442,11 @@ class Orchestrator:
         If it is a Status message, it must not be published after it was given to dataprovider_publish!
         Other types of messages must be published normally after this function is called.
         """
-        if topic.removeprefix("/") == self.status_subscription.topic_name.removeprefix("/"):
+        if topic.removeprefix("/") == self.status_topic_name:
             assert isinstance(message, Status)
             self.__status_callback(message)
             return
-        if topic not in self.interception_subs.keys():
+        if topic not in self.interception_subs:
             self.l.info(f"Got a message on topic {topic} but we are not subscribed to this input. Ignoring.")
             if self.intercepted_topic_callback is not None:
                 self.intercepted_topic_callback(topic, type(message), message)
@@ -303,11 +457,7 @@ class Orchestrator:
 
     def __has_nodes_that_change_provider_state(self) -> bool:
         """Returns true if the graph contains actions which will modify the data providers state"""
-        for _node_id, data in self.__callback_nodes_with_data():
-            model = self.__node_model_by_name(data.node)
-            if model.input_modifies_dataprovider_state(data.cause):
-                return True
-        return False
+        return len(self.provider_state_modifying_actions) > 0
 
     def wait_until_publish_allowed(self, topic: TopicName) -> Future:
         """
@@ -331,7 +481,7 @@ class Orchestrator:
 
         future = Future()
 
-        if topic not in self.interception_subs.keys():
+        if topic not in self.interception_subs:
             self.l.info(f"  We are not subscribed to input \"{topic}\", allow publish without further action")
             future.set_result(None)
             return future
@@ -359,25 +509,18 @@ class Orchestrator:
                     continue
 
                 def add_buffer(topic: TopicName, parent: GraphNodeId):
-                    buffer_node_id = _next_id()
-                    self.graph.add_node(
-                        buffer_node_id, data=OrchestratorBufferAction(TopicInput(topic)))
-                    self.graph.add_edge(buffer_node_id, parent,
-                                        edge_type=EdgeType.CAUSALITY)
+                    buffer_node_id = self.__add_graph_node(OrchestratorBufferAction(_topic_input(topic)))
+                    self.__add_edge(buffer_node_id, parent, EdgeType.CAUSALITY)
 
                 def add_status(parent: GraphNodeId):
-                    status_node_id = _next_id()
-                    self.graph.add_node(
-                        status_node_id, data=OrchestratorStatusAction())
-                    self.graph.add_edge(status_node_id, parent,
-                                        edge_type=EdgeType.CAUSALITY)
+                    status_node_id = self.__add_graph_node(OrchestratorStatusAction())
+                    self.__add_edge(status_node_id, parent, EdgeType.CAUSALITY)
 
                 if initial_time.nanoseconds < input_cause.period:
                     # Initial time before first timer invocation
                     self.l.info(f"   Expecting no callback for timer with period {input_cause.period}")
                     self.l.warn(
                         "No callback for the initial time-input, which means we can not be sure the node received the initial time")
-                    pass
                 elif input_cause.period <= initial_time.nanoseconds < 2 * input_cause.period \
                         or (initial_time.nanoseconds % input_cause.period) != 0:
                     # Initial time between first and second timer invocation
@@ -386,8 +529,7 @@ class Orchestrator:
                     self.l.info(f"   Expecting 1 callback for timer with period {input_cause.period}")
 
                     causing_action = TimerCallbackAction(ActionState.WAITING, node_name, initial_time, input_cause)
-                    causing_action_id = _next_id()
-                    self.graph.add_node(causing_action_id, data=causing_action)
+                    causing_action_id = self.__add_graph_node(causing_action)
 
                     for effect in node_model.effects_for_input(input_cause):
                         if isinstance(effect, TopicPublish):
@@ -405,8 +547,7 @@ class Orchestrator:
                         f"   Expecting 2 callbacks for timer with period {input_cause.period}")
 
                     causing_action = TimerCallbackAction(ActionState.WAITING, node_name, initial_time, input_cause)
-                    causing_action_id = _next_id()
-                    self.graph.add_node(causing_action_id, data=causing_action)
+                    causing_action_id = self.__add_graph_node(causing_action)
 
                     for effect in node_model.effects_for_input(input_cause):
                         if isinstance(effect, TopicPublish):
@@ -510,6 +651,7 @@ class Orchestrator:
 
         self.l.info("  Exchanging node models")
         self.node_models = new_node_config
+        self.__update_node_model_indices()
 
         self.l.info("  Re-initializing ros communication...")
         self.__create_subscription_lists()
@@ -536,36 +678,29 @@ class Orchestrator:
 
         # time until which timer actions have been added already
         last_time: int = self.simulator_time.nanoseconds
-
-        @dataclass
-        class Timer:
-            node: str
-            cause: TimerInput
-
-        timers: List[Timer] = []
-        for node_model in self.node_models:
-            for input_cause in node_model.get_possible_inputs():
-                if isinstance(input_cause, TimerInput):
-                    timer = Timer(node_model.get_name(), input_cause)
-                    timers.append(timer)
+        t_ns: int = t.nanoseconds
+        dt: int = t_ns - last_time
 
         expected_timer_actions: List[TimerCallbackAction] = []
 
-        for timer in timers:
-            self.l.debug(f" Considering timer {timer}")
-            nr_fires = last_time // timer.cause.period
-            last_fire = nr_fires * timer.cause.period
-            next_fire = Time(nanoseconds=last_fire + timer.cause.period)
-            self.l.debug(
-                f"  Timer has fired {nr_fires} times, the last invocation was at {last_fire}, next will be at {next_fire}")
-            dt: int = t.nanoseconds - last_time
-            if dt > timer.cause.period:
+        debug = self.l.is_enabled_for(LoggingSeverity.DEBUG)
+        for node_name, timer_input in self.timer_inputs:
+            period: int = timer_input.period
+            if debug:
+                self.l.debug(f" Considering timer with period {period} of node \"{node_name}\"")
+            nr_fires = last_time // period
+            last_fire = nr_fires * period
+            next_fire = last_fire + period
+            if debug:
+                self.l.debug(f"  Timer has fired {nr_fires} times, the last invocation was at {last_fire}, "
+                             f"next will be at {next_fire}")
+            if dt > period:
                 raise RuntimeError(f"Requested timestep too large! Stepping time from {last_time} to {t} ({dt}) "
                                    "would require firing the timer multiple times within the same timestep. "
                                    "This is probably unintended!")
-            if next_fire <= t:
-                self.l.info(f" Timer of node \"{timer.node}\" with period {timer.cause.period} will fire!")
-                action = TimerCallbackAction(ActionState.WAITING, timer.node, t, timer.cause)
+            if next_fire <= t_ns:
+                self.l.info(f" Timer of node \"{node_name}\" with period {period} will fire!")
+                action = TimerCallbackAction(ActionState.WAITING, node_name, t, timer_input)
                 expected_timer_actions.append(action)
 
         self.l.info(
@@ -577,30 +712,20 @@ class Orchestrator:
         lc(self.l, f"Adding input on topic \"{topic}\"")
 
         input_action = DataProviderInputAction(ActionState.WAITING, topic)
-        input_action_id = _next_id()
-        self.graph.add_node(input_action_id, data=input_action)
+        input_action_id = self.__add_graph_node(input_action)
         self.l.debug(f"Adding input action to graph: {input_action}")
 
-        input = TopicInput(topic)
+        input = _topic_input(topic)
 
         buffer_action = OrchestratorBufferAction(input)
-        buffer_action_id = _next_id()
-        self.graph.add_node(buffer_action_id, data=buffer_action)
-        self.graph.add_edge(buffer_action_id, input_action_id,
-                            edge_type=EdgeType.CAUSALITY)
+        buffer_action_id = self.__add_graph_node(buffer_action)
+        self.__add_edge(buffer_action_id, input_action_id, EdgeType.CAUSALITY)
 
         expected_rx_actions = []
 
-        for node in self.node_models:
-            if input in node.get_possible_inputs():
-                time_sync = False
-                if node.time_sync_info(input.input_topic) is not None:
-                    time_sync = True
-                expected_rx_actions.append(
-                    RxAction(ActionState.WAITING,
-                             node.get_name(),
-                             t,
-                             TopicInput(input.input_topic), is_approximate_time_synced=time_sync))
+        for node_name, time_sync in self.receivers_by_input_topic.get(topic, ()):
+            expected_rx_actions.append(
+                self.__create_rx_action(node_name, t, input, time_sync))
 
         self.l.info(
             f"  This input causes {len(expected_rx_actions)} rx actions")
@@ -627,9 +752,8 @@ class Orchestrator:
                 self.l.info(f"Topic input was delayed by {delta}")
             assert self.simulator_time is not None
             input_node_id = self.__add_topic_input(self.simulator_time, next.topic)
-            input_node_data: DataProviderInputAction = self.graph.nodes[input_node_id]["data"]
             self.l.debug(" Setting input action state running")
-            input_node_data.state = ActionState.RUNNING
+            self.__set_state(input_node_id, ActionState.RUNNING)
             self.l.debug(" Requesting publish")
             next.future.set_result(None)
         elif isinstance(self.next_input, FutureTimestep):
@@ -646,49 +770,57 @@ class Orchestrator:
             raise RuntimeError(
                 "No unused input available. Check if next_input exists before calling __request_next_input.")
 
-    def __callback_nodes_with_data(self) -> \
-            Generator[Tuple[GraphNodeId, Union[TimerCallbackAction, RxAction]], None, None]:
-        for id, data in self.graph.nodes(data=True):
-            action: Action = data["data"]  # type: ignore
-            if isinstance(action, TimerCallbackAction) or isinstance(action, RxAction):
-                yield id, action
-
-    def __buffer_nodes_with_data(self) -> Generator[Tuple[GraphNodeId, OrchestratorBufferAction], None, None]:
-        for id, data in self.graph.nodes(data=True):
-            action: Action = data["data"]  # type: ignore
-            if isinstance(action, OrchestratorBufferAction):
-                yield (id, action)
-
     def __buffer_childs_of_parent(self, parent: GraphNodeId) -> Generator[
         Tuple[GraphNodeId, OrchestratorBufferAction], None, None]:
-        for id, data in self.__buffer_nodes_with_data():
-            if self.graph.has_edge(id, parent):
-                yield id, data
-
-    def __edges_between(self, u: GraphNodeId, v: GraphNodeId) -> Generator[Tuple[Any, Dict], None, None]:
-        for e_u, e_v, e_k, e_d in self.graph.edges(nbunch=[u, v], data=True, keys=True):  # type: ignore
-            if e_u == u and e_v == v:
-                yield e_k, cast(Dict, e_d)
-
-    def __causality_childs_of(self, buffer_id: GraphNodeId) -> Generator[GraphNodeId, None, None]:
-        for node in self.graph.predecessors(buffer_id):
-            for _, edge_data in self.__edges_between(node, buffer_id):
-                edge_type: EdgeType = edge_data["edge_type"]
-                if edge_type == EdgeType.CAUSALITY:
-                    yield node
+        for id in self.__causality_childs_of(parent):
+            action = self.graph.actions[id]
+            if isinstance(action, OrchestratorBufferAction):
+                yield id, action
+
+    def __causality_childs_of(self, parent: GraphNodeId) -> AbstractSet[GraphNodeId]:
+        return self.causality_childs.get(parent, frozenset())
 
     def __add_action_and_effects(self, action: CallbackAction, parent: Optional[int] = None):
+        """
+        Add an action and all actions caused by it to the graph.
+
+        Caused actions are added depth-first, in the same order as a recursive traversal: The complete subtree of
+        one output is added before the buffer of the next output. This order determines SAME_NODE and SAME_TOPIC
+        edges between caused actions, and thereby the callback order.
+        An explicit stack of generators is used instead of recursion, to not be limited by the recursion depth.
+        """
+        stack = [self.__add_action(action, parent)]
+        while stack:
+            caused = next(stack[-1], None)
+            if caused is None:
+                stack.pop()
+            else:
+                stack.append(self.__add_action(*caused))
+
+    def __add_action(self, action: CallbackAction, parent: Optional[GraphNodeId]) -> \
+            Generator[Tuple[CallbackAction, GraphNodeId], None, None]:
+        """
+        Add a single action with its buffer and status actions to the graph.
+
+        Buffer and status actions are added lazily: The buffer of an output is only added when all RxActions caused
+        by previous outputs have been yielded (and added to the graph by the caller).
+
+        :return: Generator of the RxActions caused by this action, with the ID of their parent buffer action
+        """
+
+        # Formatting the debug messages below is expensive, since it includes string representations of actions
+        debug = self.l.is_enabled_for(LoggingSeverity.DEBUG)
 
         # Parent: Node ID of the action causing this topic-publish. Should only be None for inputs
-        cause_node_id = _next_id()
-        self.l.debug(f"  Adding graph node for action {action} ({cause_node_id})")
-        self.graph.add_node(cause_node_id, data=action)
+        cause_node_id = self.__add_graph_node(action)
+        if debug:
+            self.l.debug(f"  Added graph node for action {action} ({cause_node_id})")
 
         # Omit sibling connections (same node) if both actions are timer callbacks at the same time.
         # They are triggered by the same clock input, so we can not enforce an order between them.
         # The execution order is assumed to be deterministic within the node, and we forbid outputs on the same topic,
         # which could get reordered.
-        def is_timer_at_same_time(this_action, other_action: Union[TimerCallbackAction, RxAction]):
+        def is_timer_at_same_time(this_action: Action, other_action: Action):
             if not isinstance(this_action, TimerCallbackAction):
                 return False
             if not isinstance(other_action, TimerCallbackAction):
@@ -696,137 +828,248 @@ class Orchestrator:
             return this_action.timestamp == other_action.timestamp
 
         # Sibling connections: Complete all actions at this node before the to-be-added action
-        for node, other_action in self.__callback_nodes_with_data():
-            self.l.debug(f"   Testing if {other_action} ({node}) is a sibling...")
-            if other_action.node == action.node \
-                    and node != cause_node_id \
+        for node in self.callback_actions_by_node[action.node]:
+            other_action = self.graph.actions[node]
+            if debug:
+                self.l.debug(f"   Testing if {other_action} ({node}) is a sibling...")
+            if node != cause_node_id \
                     and not is_timer_at_same_time(action, other_action):
-                self.l.debug(f"   Adding same-node edge from {cause_node_id} to {node}")
-                self.graph.add_edge(cause_node_id, node, edge_type=EdgeType.SAME_NODE)
-            else:
+                if debug:
+                    self.l.debug(f"   Adding same-node edge from {cause_node_id} to {node}")
+                self.__add_edge(cause_node_id, node, EdgeType.SAME_NODE)
+            elif debug:
                 self.l.debug("   no!")
 
         if parent is not None:
-            self.l.debug(f"   Adding edge to parent: {parent}")
-            self.graph.add_edge(cause_node_id, parent,
-                                edge_type=EdgeType.CAUSALITY)
+            if debug:
+                self.l.debug(f"   Adding edge to parent: {parent}")
+            self.__add_edge(cause_node_id, parent, EdgeType.CAUSALITY)
 
         cause: Cause = action.cause
 
-        node_model = self.__node_model_by_name(action.node)
-        assert cause in node_model.get_possible_inputs()
-        effects = node_model.effects_for_input(cause)
-
-        self.l.debug(f"   This action has effects: {effects}")
+        assert cause in self.possible_inputs_by_node[action.node]
+        plan = self.__effect_plan(action.node, cause)
 
-        assert len(effects) > 0
+        if debug:
+            self.l.debug(f"   This action has effects: {plan}")
 
         # Multi-Publisher Connections:
         # Add edge to all RxActions for the topics that are published by this action
-        for effect in effects:
-            if isinstance(effect, TopicPublish):
-                # Add edge to all orchestrator buffer actions of the same topic.
-                # Why all? They are all in the same or past timestep by definition (insertion order).
-                # Not doing this would allow concurrent publishing on the same topic, which results in undeterministic receive order
-                for node, node_data in self.graph.nodes(data=True):
-                    other_action: Action = node_data["data"]  # type: ignore
-                    if isinstance(other_action,
-                                  OrchestratorBufferAction) and other_action.cause.input_topic == effect.output_topic:
-                        self.l.debug(f"   Adding edge to node {node} ({node_data}), "
-                                     "because the new action publishes on that topic.")
-                        self.graph.add_edge(cause_node_id, node, edge_type=EdgeType.SAME_TOPIC)
-
-        # Collect services relating to this action
-        services = set(node_model.get_provided_services())
-        for effect in effects:
-            if isinstance(effect, ServiceCall):
-                services.add(effect.service_name)
-        self.l.debug(f"   This action ({action}) interacts with services: {services}")
+        for topic in plan.published_topics:
+            # Add edge to all orchestrator buffer actions of the same topic.
+            # Why all? They are all in the same or past timestep by definition (insertion order).
+            # Not doing this would allow concurrent publishing on the same topic, which results in undeterministic receive order
+            for node in self.buffer_actions_by_topic[topic]:
+                if debug:
+                    self.l.debug(f"   Adding edge to node {node} ({self.graph.actions[node]}), "
+                                 "because the new action publishes on that topic.")
+                self.__add_edge(cause_node_id, node, EdgeType.SAME_TOPIC)
+
+        if debug:
+            self.l.debug(f"   This action ({action}) interacts with services: {plan.services}")
 
         # Add connection to service group
-        for service in services:
+        for service in plan.services:
             for id in self.__service_group(service):
                 if id == cause_node_id:
                     continue
-                self.l.debug(
-                    f"   Adding edge to action in service group: {id}")
-                self.graph.add_edge(cause_node_id, id,
-                                    edge_type=EdgeType.SERVICE_GROUP)
-
-        # Recursively add action nodes for publish events in the current action
-        for effect in effects:
-            if isinstance(effect, TopicPublish):
-                resulting_input = TopicInput(effect.output_topic)
+                if debug:
+                    self.l.debug(f"   Adding edge to action in service group: {id}")
+                self.__add_edge(cause_node_id, id, EdgeType.SERVICE_GROUP)
 
+        # Yield action nodes for publish events in the current action
+        for output in plan.outputs:
+            if isinstance(output, _TopicOutputPlan):
                 # Add buffer node
-                buffer_node_id = _next_id()
-                self.graph.add_node(
-                    buffer_node_id, data=OrchestratorBufferAction(resulting_input))
+                buffer_node_id = self.__add_graph_node(OrchestratorBufferAction(output.input))
 
                 # Link buffer node upwards
-                self.graph.add_edge(
-                    buffer_node_id, cause_node_id, edge_type=EdgeType.CAUSALITY)
-
-                # Recursively add RX actions as children of buffer node
-                for node in self.node_models:
-                    if resulting_input in node.get_possible_inputs():
-                        time_sync = False
-                        if node.time_sync_info(resulting_input.input_topic) is not None:
-                            time_sync = True
-                        self.__add_action_and_effects(
-                            RxAction(
-                                ActionState.WAITING,
-                                node.get_name(),
-                                action.timestamp,
-                                resulting_input, is_approximate_time_synced=time_sync
-                            ), buffer_node_id)
-            elif isinstance(effect, StatusPublish):
-                status_node_id = _next_id()
-                self.l.debug(f"   Adding OrchestratorStatusAction with id {status_node_id}")
-                self.graph.add_node(
-                    status_node_id, data=OrchestratorStatusAction())
-                self.graph.add_edge(
-                    status_node_id, cause_node_id, edge_type=EdgeType.CAUSALITY)
-            elif isinstance(effect, ServiceCall):
-                pass
+                self.__add_edge(buffer_node_id, cause_node_id, EdgeType.CAUSALITY)
+
+                # RX actions are children of buffer node
+                for node_name, time_sync in output.receivers:
+                    yield (self.__create_rx_action(node_name, action.timestamp, output.input, time_sync),
+                           buffer_node_id)
+            else:
+                status_node_id = self.__add_graph_node(OrchestratorStatusAction())
+                if debug:
+                    self.l.debug(f"   Added OrchestratorStatusAction with id {status_node_id}")
+                self.__add_edge(status_node_id, cause_node_id, EdgeType.CAUSALITY)
 
     def __find_service_provider_node(self, service: str) -> Optional[NodeModel]:
-        for node_model in self.node_models:
-            if service in node_model.get_provided_services():
-                return node_model
+        node_model = self.node_models_by_provided_service.get(service)
+        if node_model is not None:
+            return node_model
         self.l.warn(f"No service provider for \"{service}\" known")
         return None
 
     def __service_group(self, service: str) -> Set[GraphNodeId]:
         """Find all actions which relate to a service"""
-        l: Set[GraphNodeId] = set()
+        # Add actions which call the service
+        l: Set[GraphNodeId] = set(self.callback_actions_by_called_service[service])
 
-        service_call = ServiceCall(service_name=service)
+        # Add actions at node provider
         service_provider_node_model = self.__find_service_provider_node(service)
         if service_provider_node_model:
-            service_provider_node = service_provider_node_model.get_name()
-        else:
-            service_provider_node = None
-
-        for graph_node_id, data in self.__callback_nodes_with_data():
-            # Add actions at node provider
-            if service_provider_node is not None and data.node == service_provider_node:
-                l.add(graph_node_id)
-                continue
-
-            # Add actions which call the service
-            node_model = self.__node_model_by_name(data.node)
-            if service_call in node_model.effects_for_input(data.cause):
-                l.add(graph_node_id)
-                continue
+            l.update(self.callback_actions_by_node[service_provider_node_model.get_name()])
 
         return l
 
+    def __add_graph_node(self, action: Action) -> GraphNodeId:
+        """Add an action to the graph under a new ID, and add it to the indices."""
+        node_id = _next_id()
+        self.graph.add_node(node_id, action)
+        if isinstance(action, RxAction) or isinstance(action, TimerCallbackAction):
+            self.callback_actions_by_node[action.node].add(node_id)
+            if (action.node, action.cause) in self.reconfiguring_inputs:
+                self.reconfiguring_actions.add(node_id)
+            if (action.node, action.cause) in self.provider_state_modifying_inputs:
+                self.provider_state_modifying_actions.add(node_id)
+            for service in self.called_services_by_input.get((action.node, action.cause), ()):
+                self.callback_actions_by_called_service[service].add(node_id)
+            if isinstance(action, RxAction):
+                self.rx_actions_by_topic[action.topic].add(node_id)
+            elif action.state == ActionState.WAITING:
+                self.__add_waiting_timer(node_id, action)
+            self.actions_by_state[action.state].add(node_id)
+            if action.state == ActionState.RUNNING:
+                self.running_actions_by_node[action.node].add(node_id)
+                self.__add_running_publisher(node_id, action)
+        elif isinstance(action, DataProviderInputAction):
+            self.actions_by_state[action.state].add(node_id)
+            if action.state == ActionState.RUNNING:
+                self.__add_running_publisher(node_id, action)
+        elif isinstance(action, OrchestratorBufferAction):
+            self.buffer_actions_by_topic[action.cause.input_topic].add(node_id)
+        return node_id
+
+    def __remove_graph_node(self, node_id: GraphNodeId):
+        """Remove an action from the graph and from the indices."""
+        action: Action = self.graph.actions[node_id]
+        unconstrained = self.graph.remove_node(node_id)
+        parent = self.causality_parents.pop(node_id, None)
+        if parent is not None:
+            siblings = self.causality_childs[parent]
+            siblings.discard(node_id)
+            if not siblings:
+                del self.causality_childs[parent]
+        for child in self.causality_childs.pop(node_id, ()):
+            del self.causality_parents[child]
+        self.ready_actions.discard(node_id)
+        for unconstrained_id in unconstrained:
+            self.__update_ready(unconstrained_id)
+        if isinstance(action, RxAction) or isinstance(action, TimerCallbackAction):
+            self.callback_actions_by_node[action.node].discard(node_id)
+            self.reconfiguring_actions.discard(node_id)
+            self.provider_state_modifying_actions.discard(node_id)
+            for service in self.called_services_by_input.get((action.node, action.cause), ()):
+                self.callback_actions_by_called_service[service].discard(node_id)
+            if isinstance(action, RxAction):
+                self.rx_actions_by_topic[action.topic].discard(node_id)
+            elif action.state == ActionState.WAITING:
+                self.__discard_waiting_timer(node_id, action)
+            self.actions_by_state[action.state].discard(node_id)
+            self.running_actions_by_node[action.node].discard(node_id)
+            if action.state == ActionState.RUNNING:
+                self.__discard_running_publisher(node_id, action)
+        elif isinstance(action, DataProviderInputAction):
+            self.actions_by_state[action.state].discard(node_id)
+            if action.state == ActionState.RUNNING:
+                self.__discard_running_publisher(node_id, action)
+        elif isinstance(action, OrchestratorBufferAction):
+            self.buffer_actions_by_topic[action.cause.input_topic].discard(node_id)
+        if isinstance(action, RxAction):
+            # Release buffered message
+            action.data = None
+            self.rx_action_pool.append(action)
+
+    def __create_rx_action(self, node: NodeName, timestamp: Time, cause: TopicInput,
+                           is_approximate_time_synced: bool) -> RxAction:
+        """Create a waiting RxAction, reusing a removed one if available. Add it to the graph afterwards."""
+        if not self.rx_action_pool:
+            return RxAction(ActionState.WAITING, node, timestamp, cause,
+                            is_approximate_time_synced=is_approximate_time_synced)
+        action = self.rx_action_pool.pop()
+        action.state = ActionState.WAITING
+        action.node = node
+        action.timestamp = timestamp
+        action.cause = cause
+        action.is_approximate_time_synced = is_approximate_time_synced
+        return action
+
+    def __set_state(self, node_id: GraphNodeId, state: ActionState):
+        """Change the state of a callback or data provider input action, and update the indices."""
+        action = cast(Union[CallbackAction, DataProviderInputAction], self.graph.actions[node_id])
+        self.actions_by_state[action.state].discard(node_id)
+        self.actions_by_state[state].add(node_id)
+        if action.state == ActionState.RUNNING and state != ActionState.RUNNING:
+            self.__discard_running_publisher(node_id, action)
+        elif action.state != ActionState.RUNNING and state == ActionState.RUNNING:
+            self.__add_running_publisher(node_id, action)
+        if isinstance(action, RxAction) or isinstance(action, TimerCallbackAction):
+            if state == ActionState.RUNNING:
+                self.running_actions_by_node[action.node].add(node_id)
+            else:
+                self.running_actions_by_node[action.node].discard(node_id)
+        if isinstance(action, TimerCallbackAction):
+            if action.state == ActionState.WAITING:
+                self.__discard_waiting_timer(node_id, action)
+            if state == ActionState.WAITING:
+                self.__add_waiting_timer(node_id, action)
+        action.state = state
+        self.__update_ready(node_id)
+
+    def __update_ready(self, node_id: GraphNodeId):
+        """Add or remove the action from ready_actions, according to its state and constraints"""
+        action = self.graph.actions[node_id]
+        if (isinstance(action, RxAction) or isinstance(action, TimerCallbackAction)) \
+                and action.state == ActionState.READY and self.graph.out_degree(node_id) == 0:
+            if node_id not in self.ready_actions:
+                self.ready_actions.add(node_id)
+                heapq.heappush(self.ready_queue, node_id)
+        else:
+            self.ready_actions.discard(node_id)
+
+    def __add_edge(self, u: GraphNodeId, v: GraphNodeId, edge_type: EdgeType):
+        """Add an edge to the graph. The source action u is no longer free of constraints."""
+        self.graph.add_edge(u, v, edge_type)
+        self.ready_actions.discard(u)
+        if edge_type == EdgeType.CAUSALITY:
+            parent = self.causality_parents.setdefault(u, v)
+            if parent != v:
+                raise RuntimeError(f"Mutliple parent nodes of node {u}: {parent} and {v}")
+            self.causality_childs.setdefault(v, set()).add(u)
+
+    def __published_topics(self, action: Union[CallbackAction, DataProviderInputAction]) -> Tuple[TopicName, ...]:
+        if isinstance(action, DataProviderInputAction):
+            return (action.published_topic,)
+        return self.__effect_plan(action.node, action.cause).published_topics
+
+    def __add_running_publisher(self, node_id: GraphNodeId, action: Union[CallbackAction, DataProviderInputAction]):
+        for topic in self.__published_topics(action):
+            self.running_actions_by_published_topic[topic].add(node_id)
+
+    def __discard_running_publisher(self, node_id: GraphNodeId,
+                                    action: Union[CallbackAction, DataProviderInputAction]):
+        for topic in self.__published_topics(action):
+            self.running_actions_by_published_topic[topic].discard(node_id)
+
+    def __add_waiting_timer(self, node_id: GraphNodeId, action: TimerCallbackAction):
+        self.waiting_timer_actions_by_time.setdefault(action.timestamp.nanoseconds, set()).add(node_id)
+
+    def __discard_waiting_timer(self, node_id: GraphNodeId, action: TimerCallbackAction):
+        ids = self.waiting_timer_actions_by_time.get(action.timestamp.nanoseconds)
+        if ids is None:
+            return
+        ids.discard(node_id)
+        if not ids:
+            del self.waiting_timer_actions_by_time[action.timestamp.nanoseconds]
+
     def __remove_node(self, graph_node: GraphNodeId, recursive=False):
         if recursive:
             for child in list(self.__causality_childs_of(graph_node)):
                 self.__remove_node(child, recursive=True)
-        self.graph.remove_node(graph_node)
+        self.__remove_graph_node(graph_node)
         if self.__graph_is_empty() and self.dataprovider_pending_actions_future is not None:
             self.l.info("  Graph is now empty, allowing data provider to continue.")
             if self.dataprovider_pending_actions_future_timestamp is not None:
@@ -836,71 +1079,69 @@ class Orchestrator:
             self.dataprovider_pending_actions_future = None
 
     def __process(self):
-        lc(self.l, f"Processing Graph with {self.graph.number_of_nodes()} nodes")
-        repeat: bool = True
-        while repeat:
-            repeat = False
-            for graph_node_id, data in list(self.__callback_nodes_with_data()):
+        lc(self.l, f"Processing Graph with {len(self.graph)} nodes")
+        debug = self.l.is_enabled_for(LoggingSeverity.DEBUG)
+        while self.ready_actions:
+            # Lowest ID is the earliest inserted action
+            graph_node_id = heapq.heappop(self.ready_queue)
+            if graph_node_id not in self.ready_actions:
+                continue
+            data = self.graph.actions[graph_node_id]
+            if debug:
                 self.l.debug(f"Node {graph_node_id}: {data}")
-                # Skip actions that still have ordering constraints
-                if cast(int, self.graph.out_degree(graph_node_id)) > 0:
-                    self.l.debug("Has dependencies")
-                    continue
-                # Skip actions which are still missing their data
-                if data.state != ActionState.READY:
-                    self.l.debug("Is not ready")
-                    continue
-                if isinstance(data, RxAction) and data.is_approximate_time_synced:
-                    assert isinstance(data, RxAction)
-                    # Search time synchronizer
-                    time_sync_tracker: Optional[ApproximateTimeSynchronizerTracker] = None
-                    for tsi, ts in self.time_sync_models[data.node].items():
-                        if data.cause.input_topic in tsi.input_topics:
-                            time_sync_tracker = ts
-                            break
-                    assert time_sync_tracker is not None
-                    callback_occurs = time_sync_tracker.test_input(
-                        data.cause.input_topic, data.data)
-                    if callback_occurs:
-                        self.l.info(
-                            f"    Action is ready and has no constraints, and (multi-input-)callback will occur: RX of {data.topic} ({type(data.data).__name__}) at node {data.node}. Publishing data...")
-                    else:
-                        self.l.info(
-                            f"    Action is ready and has no constraints, but (multi-input-)callback will not occur: RX of {data.topic} ({type(data.data).__name__}) at node {data.node}. Publishing data and removing effects...")
-                        for child in list(self.__causality_childs_of(graph_node_id)):
-                            child_data: Action = self.graph.nodes[child]["data"]
-                            if not isinstance(child_data, OrchestratorStatusAction):
-                                self.l.debug(f"Removing effect {child_data}")
-                                self.__remove_node(child, recursive=True)
-                    data.state = ActionState.RUNNING
-                    if self.state_sequence_recording:
-                        self.__node_model_by_name(data.node).state_sequence_push(data.data)
-                    pub = self.interception_pubs[data.node][data.topic]
-                    self.l.info(f"Publishing data on intercepted topic {pub.topic_name}")
-                    pub.publish(data.data)
-                elif isinstance(data, RxAction):
-                    assert data.data is not None
+            if isinstance(data, RxAction) and data.is_approximate_time_synced:
+                assert isinstance(data, RxAction)
+                # Search time synchronizer
+                time_sync_tracker: Optional[ApproximateTimeSynchronizerTracker] = None
+                for tsi, ts in self.time_sync_models[data.node].items():
+                    if data.cause.input_topic in tsi.input_topics:
+                        time_sync_tracker = ts
+                        break
+                assert time_sync_tracker is not None
+                callback_occurs = time_sync_tracker.test_input(
+                    data.cause.input_topic, data.data)
+                if callback_occurs:
                     self.l.info(
-                        f"    Action is ready and has no constraints: RX of {data.topic} ({type(data.data).__name__}) at node {data.node} ({graph_node_id}). Publishing data...")
-                    data.state = ActionState.RUNNING
-                    if self.state_sequence_recording:
-                        self.__node_model_by_name(data.node).state_sequence_push(data.data)
-                    pub = self.interception_pubs[data.node][data.topic]
-                    self.l.info(f"Publishing data on intercepted topic {pub.topic_name}")
-                    pub.publish(data.data)
-                elif isinstance(data, TimerCallbackAction):
+                        f"    Action is ready and has no constraints, and (multi-input-)callback will occur: RX of {data.topic} ({type(data.data).__name__}) at node {data.node}. Publishing data...")
+                else:
                     self.l.info(
-                        f"    Action is ready and has no constraints: Timer callback with period "
-                        f"{data.cause.period} at time {data.timestamp} of node {data.node}. Publishing clock...")
-                    data.state = ActionState.RUNNING
-                    time_msg = rosgraph_msgs.msg.Clock()
-                    time_msg.clock = data.timestamp.to_msg()
-                    if self.state_sequence_recording:
-                        self.__node_model_by_name(data.node).state_sequence_push(time_msg)
-                    pub = self.interception_pubs[data.node][normalize_topic_name("clock")]
-                    self.l.info(f"Publishing data on intercepted topic {pub.topic_name}")
-                    pub.publish(time_msg)
-                repeat = True
+                        f"    Action is ready and has no constraints, but (multi-input-)callback will not occur: RX of {data.topic} ({type(data.data).__name__}) at node {data.node}. Publishing data and removing effects...")
+                    for child in list(self.__causality_childs_of(graph_node_id)):
+                        child_data: Action = self.graph.actions[child]
+                        if not isinstance(child_data, OrchestratorStatusAction):
+                            if debug:
+                                self.l.debug(f"Removing effect {child_data}")
+                            self.__remove_node(child, recursive=True)
+                self.__set_state(graph_node_id, ActionState.RUNNING)
+                if self.state_sequence_recording:
+                    self.__node_model_by_name(data.node).state_sequence_push(data.data)
+                pub = self.interception_pubs[data.node][data.topic]
+                self.l.info(f"Publishing data on intercepted topic {pub.topic_name}")
+                pub.publish(data.data)
+            elif isinstance(data, RxAction):
+                assert data.data is not None
+                self.l.info(
+                    f"    Action is ready and has no constraints: RX of {data.topic} ({type(data.data).__name__}) at node {data.node} ({graph_node_id}). Publishing data...")
+                self.__set_state(graph_node_id, ActionState.RUNNING)
+                if self.state_sequence_recording:
+                    self.__node_model_by_name(data.node).state_sequence_push(data.data)
+                pub = self.interception_pubs[data.node][data.topic]
+                self.l.info(f"Publishing data on intercepted topic {pub.topic_name}")
+                pub.publish(data.data)
+            elif isinstance(data, TimerCallbackAction):
+                self.l.info(
+                    f"    Action is ready and has no constraints: Timer callback with period "
+                    f"{data.cause.period} at time {data.timestamp} of node {data.node}. Publishing clock...")
+                self.__set_state(graph_node_id, ActionState.RUNNING)
+                time_msg = rosgraph_msgs.msg.Clock()
+                time_msg.clock = data.timestamp.to_msg()
+                if self.state_sequence_recording:
+                    self.__node_model_by_name(data.node).state_sequence_push(time_msg)
+                pub = self.interception_pubs[data.node][_CLOCK_TOPIC]
+                self.l.info(f"Publishing data on intercepted topic {pub.topic_name}")
+                pub.publish(time_msg)
+            else:
+                raise RuntimeError(f"Action {data} ({graph_node_id}) is ready but not a callback action")
         self.l.info(
             "  Done processing! Checking if next input can be requested...")
 
@@ -932,6 +1173,20 @@ class Orchestrator:
             result.add_done_callback(self.__reconfiguration_done_callback)
             self.l.debug("  Sent request")
 
+    def __schedule_process(self):
+        """
+        Process the graph once the executor has handled all currently available messages.
+
+        This way, a burst of messages results in a single processing pass instead of one pass per message.
+        """
+        if not self.process_scheduled:
+            self.process_scheduled = True
+            self.process_guard_condition.trigger()
+
+    def __scheduled_process_callback(self):
+        self.process_scheduled = False
+        self.__process()
+
     def __reconfiguration_done_callback(self, future: Future):
         assert future.done()
         response = cast(ReconfigurationRequest.Response, future.result())
@@ -964,21 +1219,14 @@ class Orchestrator:
 
         # If there is some action which may cause reconfiguration, we can't accept the next input yet, since the entire
         # node graph may change for that input...
-        for _graph_node_id, node_data in self.__callback_nodes_with_data():
-            model = self.__node_model_by_name(node_data.node)
-            if model.input_may_cause_reconfiguration(node_data.cause):
-                return False
+        if self.reconfiguring_actions:
+            return False
 
         if isinstance(self.next_input, FutureTimestep):
             # We are ready for time input as soon as there are no actions left waiting for another (earlier)
             # clock input.
-            for _graph_node_id, node_data in self.graph.nodes(data=True):
-                data: Action = node_data["data"]  # type: ignore
-                if not isinstance(data, TimerCallbackAction):
-                    continue
-                if data.state != ActionState.WAITING:
-                    continue
-                if data.timestamp == self.next_input.time:
+            for timestamp in self.waiting_timer_actions_by_time:
+                if timestamp == self.next_input.time.nanoseconds:
                     continue
                 self.l.debug("Not ready for next clock input since some actions are waiting for another clock input")
                 return False
@@ -988,57 +1236,40 @@ class Orchestrator:
             # Note: We *could* already accept the input if the parents of all those buffer nodes are not
             # currently running. This might enable running more nodes from different timesteps in parallel.
             # This is not currently implemented, and the benefit might not be substantial.
-            for _graph_node_id, data in self.__callback_nodes_with_data():
-                data: CallbackAction = data
-                if isinstance(data.cause, TopicInput) and data.cause.input_topic == self.next_input.topic:
-                    return False
+            if self.rx_actions_by_topic[self.next_input.topic]:
+                return False
             return True
         assert False
 
     def __graph_is_empty(self) -> bool:
-        return self.graph.number_of_nodes() == 0
+        return len(self.graph) == 0
 
     def __find_running_action(self, published_topic_name: TopicName) -> int:
         """Find running action which published the message on the specified topic"""
-        for node_id, rd in self.graph.nodes(data=True):
-            d: Action = rd["data"]  # type: ignore
-            if isinstance(d, TimerCallbackAction) or isinstance(d, RxAction):
-                if d.state == ActionState.RUNNING:
-                    node_model = self.__node_model_by_name(d.node)
-                    outputs = node_model.effects_for_input(d.cause)
-                    for output in outputs:
-                        if output == TopicPublish(published_topic_name):
-                            return node_id
-            elif isinstance(d, DataProviderInputAction):
-                if d.published_topic == published_topic_name and d.state == ActionState.RUNNING:
-                    return node_id
-            elif isinstance(d, OrchestratorBufferAction) or isinstance(d, OrchestratorStatusAction):
-                pass
-            else:
-                raise RuntimeError(f"Unknown action type: {d}")
+        running_publishers = self.running_actions_by_published_topic[published_topic_name]
+        if running_publishers:
+            # Lowest ID is the earliest inserted action, if multiple actions are running
+            return min(running_publishers)
 
-        node_list = '\n'.join(["(" + str(nid) + ", " + str(nd["data"]) + ")" for nid, nd in
-                               cast(Iterable[tuple[Any, dict]], self.graph.nodes(data=True))])
+        node_list = '\n'.join(["(" + str(nid) + ", " + str(action) + ")" for nid, action in
+                               self.graph.actions.items()])
         raise ActionNotFoundError(
             f"There is no currently running action which should have published a message on topic \"{published_topic_name}\"! "
             f"Current graph nodes: \n{node_list}")
 
     def __find_running_action_status(self, node_name: NodeName) -> GraphNodeId:
-        for node_id, node_data in self.graph.nodes(data=True):
-
-            d = cast(Action, node_data["data"])  # type: ignore
-            if isinstance(d, OrchestratorStatusAction):
-                parent = self.__parent_node(node_id)
-                assert parent is not None
-                parent_data = cast(
-                    CallbackAction, self.graph.nodes[parent]["data"])
-                if parent_data.node == node_name and parent_data.state == ActionState.RUNNING:
-                    return node_id
-            else:
-                pass
+        status_node_ids: List[GraphNodeId] = []
+        for running_id in self.running_actions_by_node[node_name]:
+            # Status actions are connected to their parent by a causality edge
+            for child_id in self.__causality_childs_of(running_id):
+                if isinstance(self.graph.actions[child_id], OrchestratorStatusAction):
+                    status_node_ids.append(child_id)
+        if status_node_ids:
+            # Lowest ID is the earliest inserted status action
+            return min(status_node_ids)
         raise ActionNotFoundError(
             f"There is no currently running action for node {node_name} which should have published a status message.\n"
-            f"Graph: {self.graph.nodes(data=True)}")
+            f"Graph: {list(self.graph.actions.items())}")
 
     def plot_graph(self) -> None:
         """
@@ -1046,6 +1277,9 @@ class Orchestrator:
         Requires `netgraph <https://github.com/paulbrodersen/netgraph>`_, which is optional otherwise.
         """
 
+        # Imported here, since plotting is only used for debugging and these are slow to import
+        import matplotlib.pyplot as plt
+
         try:
             import netgraph  # pyright: ignore [reportMissingImports]
         except ImportError:
@@ -1055,12 +1289,11 @@ class Orchestrator:
             self.l.warning("Python module \"netgraph\" not installed, callback graph display not available.")
             return
 
-        if self.graph.number_of_nodes() == 0:
+        if len(self.graph) == 0:
             return
 
         annotations = {}
-        for node, node_data in self.graph.nodes(data=True):
-            d: Action = node_data["data"]  # type: ignore
+        for node, d in self.graph.actions.items():
             if isinstance(d, RxAction):
                 annotations[node] = f"{d.node}: rx {d.cause.input_topic}"
             elif isinstance(d, TimerCallbackAction):
@@ -1081,8 +1314,7 @@ class Orchestrator:
             EdgeType.SERVICE_GROUP: "tab:red"
         }
         edge_colors = {}
-        for u, v, k, edge_data in self.graph.edges(data=True, keys=True):  # type: ignore
-            edge_type = edge_data["edge_type"]  # type: ignore
+        for u, v, edge_type in self.graph.edges():
             edge_colors[(u, v)] = color_map[edge_type]
 
         edge_proxy_artists = []
@@ -1101,7 +1333,7 @@ class Orchestrator:
             handles=edge_proxy_artists, loc='upper right', title='Edges')
         ax.add_artist(edge_legend)
 
-        plot_instance = netgraph.InteractiveGraph(self.graph,
+        plot_instance = netgraph.InteractiveGraph(self.graph.to_networkx(),
                                                   annotations=annotations,
                                                   node_labels=True,
                                                   arrows=True,
@@ -1113,120 +1345,110 @@ class Orchestrator:
 
         plt.show()
 
-    def __interception_subscription_callback(self, topic_name: TopicName, msg: Union[rosgraph_msgs.msg.Clock, bytes]):
+    def __accept_intercepted_message(self, topic_name: TopicName, msg: Union[rosgraph_msgs.msg.Clock, bytes]) -> bool:
+        """
+        Common handling of all intercepted messages.
+
+        :return: False if this message should be ignored
+        """
         lc(self.l, f"Received message on intercepted topic {topic_name}")
 
         if self.ignore_next_input_from_topic[topic_name]:
             self.ignore_next_input_from_topic[topic_name] = False
             self.l.info(
                 f"Ignoring input from topic {topic_name} since it was already given to us by dataprovider_publish()")
-            return
+            return False
 
         if self.intercepted_topic_callback is not None:
             self.intercepted_topic_callback(topic_name, self.topic_types[topic_name], msg)
+        return True
 
-        if topic_name == normalize_topic_name("clock"):
+    def __clock_subscription_callback(self, msg: rosgraph_msgs.msg.Clock):
+        if not self.__accept_intercepted_message(_CLOCK_TOPIC, msg):
+            return
 
-            clock_msg = cast(rosgraph_msgs.msg.Clock, msg)
-            time_input = Time.from_msg(
-                clock_msg.clock, clock_type=ClockType.SYSTEM_TIME)
+        time_input = Time.from_msg(
+            msg.clock, clock_type=ClockType.SYSTEM_TIME)
 
-            self.l.debug(f"Time input: {time_input}")
-            self.l.debug(f"Simulator time: {self.simulator_time}")
+        self.l.debug(f"Time input: {time_input}")
+        self.l.debug(f"Simulator time: {self.simulator_time}")
 
-            if time_input != self.simulator_time:
-                # "Advancing time" means setting self.simulator_time, and allowing publishing of the corresponding value.
-                # If no actions wait for a specific timestep, this might happen before the timestep is actually received.
-                self.l.debug(
-                    f"  This clock input is for time {time_input}, but we already advanced time to {self.simulator_time}. Nothing should happen now...")
+        if time_input != self.simulator_time:
+            # "Advancing time" means setting self.simulator_time, and allowing publishing of the corresponding value.
+            # If no actions wait for a specific timestep, this might happen before the timestep is actually received.
+            self.l.debug(
+                f"  This clock input is for time {time_input}, but we already advanced time to {self.simulator_time}. Nothing should happen now...")
 
-            for action_node_id, node_data in self.graph.nodes(data=True):
-                rxdata: Action = node_data["data"]  # type: ignore
-                if not isinstance(rxdata, TimerCallbackAction):
-                    continue
-                self.l.debug(f"node {action_node_id}: {rxdata}")
-                if rxdata.timestamp != time_input:
-                    continue
-                if rxdata.state != ActionState.WAITING:
-                    continue
-                self.l.info(f"  Setting action to ready: {rxdata}")
-                rxdata.state = ActionState.READY
+        waiting_timer_actions = self.waiting_timer_actions_by_time.get(time_input.nanoseconds)
+        if not waiting_timer_actions and not self.pending_reconfiguration:
+            # No timer callbacks at this time. The graph is unchanged, so processing would not do anything.
+            return
 
-        else:
+        # sorted list creation to allow state modification while iterating, in insertion order
+        for action_node_id in sorted(waiting_timer_actions or ()):
+            rxdata = self.graph.actions[action_node_id]
+            self.l.info(f"  Setting action to ready: {rxdata}")
+            self.__set_state(action_node_id, ActionState.READY)
 
-            # Complete the action which sent this message
-            cause_action_id: Optional[GraphNodeId] = None
-            causing_action: Union[None, CallbackAction, DataProviderInputAction] = None
+        self.__schedule_process()
 
-            cause_action_id = self.__find_running_action(topic_name)
-            causing_action = cast(Union[CallbackAction, DataProviderInputAction],
-                                  self.graph.nodes[cause_action_id]["data"])
+    def __interception_subscription_callback(self, topic_name: TopicName, msg: Union[rosgraph_msgs.msg.Clock, bytes]):
+        if topic_name == _CLOCK_TOPIC:
+            self.__clock_subscription_callback(cast(rosgraph_msgs.msg.Clock, msg))
+            return
 
-            # Buffer this data for next actions
+        if not self.__accept_intercepted_message(topic_name, msg):
+            return
 
+        # Complete the action which sent this message
+        cause_action_id = self.__find_running_action(topic_name)
+        causing_action = self.graph.actions[cause_action_id]
+
+        # Buffer this data for next actions
+
+        # Only handle first buffer node of this topic below the causing action.
+        buffer_id = min((id for id in self.buffer_actions_by_topic[topic_name]
+                         if self.causality_parents.get(id) == cause_action_id), default=None)
+        if buffer_id is not None:
+            debug = self.l.is_enabled_for(LoggingSeverity.DEBUG)
+            i = 0
+            # Iterate over all callbacks below this buffer
             # list creation to allow graph modification while iterating
-            # Iterate over all children which are buffers
-            for buffer_id, buffer_data in list(self.__buffer_childs_of_parent(cause_action_id)):
-                if buffer_data.cause.input_topic == topic_name:
-                    i = 0
-                    # Iterate over all callbacks below this buffer
-                    for child_id in list(self.__causality_childs_of(buffer_id)):
-                        action: Action = self.graph.nodes[child_id]["data"]
-                        if isinstance(action, RxAction):
-                            assert (action.state == ActionState.WAITING)
-                            assert (action.data is None)
-                            self.l.debug(
-                                f" Buffering data and readying action and removing edge to parent: {child_id}: {action}")
-                            action.data = msg
-                            action.state = ActionState.READY
-                            i += 1
-                        else:
-                            raise RuntimeError(
-                                f"Action {action} ({child_id}) is a child of a buffer action but not an RxAction!")
-                    self.l.info(
-                        f" Buffered data at all {i} subsequent actions, deleting buffer node")
-                    self.__remove_node(buffer_id)
-                    break  # Only handle first buffer node
-
-            if self.__in_degree_by_type(cause_action_id, EdgeType.CAUSALITY) == 0:
-                # Only remove the node if no other callbacks require input from it.
-                # Otherwise, a callback publishing multiple topics would be removed too early!
-                assert causing_action is not None
-                self.l.info(
-                    f"  This completes the {type(causing_action).__name__} action! Removing...")
-                self.__remove_node(cause_action_id)
+            for child_id in list(self.__causality_childs_of(buffer_id)):
+                action: Action = self.graph.actions[child_id]
+                if isinstance(action, RxAction):
+                    assert (action.state == ActionState.WAITING)
+                    assert (action.data is None)
+                    if debug:
+                        self.l.debug(
+                            f" Buffering data and readying action and removing edge to parent: {child_id}: {action}")
+                    action.data = msg
+                    self.__set_state(child_id, ActionState.READY)
+                    i += 1
+                else:
+                    raise RuntimeError(
+                        f"Action {action} ({child_id}) is a child of a buffer action but not an RxAction!")
+            self.l.info(
+                f" Buffered data at all {i} subsequent actions, deleting buffer node")
+            self.__remove_node(buffer_id)
 
-        self.__process()
+        if len(self.__causality_childs_of(cause_action_id)) == 0:
+            # Only remove the node if no other callbacks require input from it.
+            # Otherwise, a callback publishing multiple topics would be removed too early!
+            self.l.info(
+                f"  This completes the {type(causing_action).__name__} action! Removing...")
+            self.__remove_node(cause_action_id)
 
-    def __in_degree_by_type(self, node: GraphNodeId, edge_type: EdgeType) -> int:
-        """ Returns the in-degree of an edge filtered by edge type """
-        degree = 0
-        edge_data: dict
-        for u, v, edge_data in self.graph.in_edges(node, data=True):  # type: ignore
-            type: EdgeType = edge_data["edge_type"]
-            if type == edge_type:
-                degree += 1
-        return degree
+        self.__schedule_process()
 
     def __parent_node(self, node: GraphNodeId) -> Optional[GraphNodeId]:
-        parent = None
-
-        edge_data: dict
-        for u, v, edge_data in self.graph.out_edges(node, data=True):  # type: ignore
-            type: EdgeType = edge_data["edge_type"]  # type: ignore
-            if type == EdgeType.CAUSALITY:
-                if parent is not None:
-                    raise RuntimeError(
-                        f"Mutliple parent nodes of node {node}: {parent} and {v}")
-                parent = v
-        return parent
+        return self.causality_parents.get(node)
 
     def __node_model_by_name(self, name) -> NodeModel:
-        for node in self.node_models:
-            if node.get_name() == name:
-                return node
-
-        raise KeyError(f"No model for node \"{name}\"")
+        model = self.node_models_by_name.get(name)
+        if model is None:
+            raise KeyError(f"No model for node \"{name}\"")
+        return model
 
     def __status_callback(self, msg: Status):
         lc(self.l, f"Received status message from {msg.node_name} with debug id {msg.debug_id}")
@@ -1246,8 +1468,9 @@ class Orchestrator:
         else:
             self.l.info(f" Status message was expected, removing status node {status_node_id}.")
             cause_action_id = self.__parent_node(status_node_id)
-            assert self.graph.nodes[cause_action_id]["data"].state == ActionState.RUNNING
-            causing_action = self.graph.nodes[cause_action_id]["data"]
+            assert cause_action_id is not None
+            causing_action = cast(CallbackAction, self.graph.actions[cause_action_id])
+            assert causing_action.state == ActionState.RUNNING
             self.__remove_node(status_node_id)
 
         for omitted_output_topic_name in msg.omitted_outputs:
@@ -1258,16 +1481,17 @@ class Orchestrator:
                 self.l.warn(
                     f"  Status message specifies omitted topic output {omitted_output_topic_name}, but it was not expected, ignoring...")
                 continue
-            causing_action = cast(CallbackAction, self.graph.nodes[cause_action_id]["data"])
+            causing_action = cast(CallbackAction, self.graph.actions[cause_action_id])
             assert isinstance(causing_action, CallbackAction)
             assert causing_action.node == msg.node_name
-            for buffer_id, buffer_data in list(self.__buffer_childs_of_parent(cause_action_id)):
-                if buffer_data.cause.input_topic == omitted_output_topic_name:
-                    self.l.debug(f"  deleting buffer node {buffer_id} recursively")
-                    self.__remove_node(buffer_id, recursive=True)
-                    # Remove at most one buffer node of this topic.
-                    # During timer-init, two identical buffer nodes exist.
-                    break
+            # Remove at most one buffer node of this topic.
+            # During timer-init, two identical buffer nodes exist. The lowest ID is chosen, as when receiving a
+            # message on this topic.
+            buffer_id = min((id for id, buffer_data in self.__buffer_childs_of_parent(cause_action_id)
+                             if buffer_data.cause.input_topic == omitted_output_topic_name), default=None)
+            if buffer_id is not None:
+                self.l.debug(f"  deleting buffer node {buffer_id} recursively")
+                self.__remove_node(buffer_id, recursive=True)
 
         if cause_action_id is None:
             self.__diagnose_invalid_status(msg)
@@ -1275,7 +1499,7 @@ class Orchestrator:
 
         assert causing_action is not None
 
-        in_degree = self.__in_degree_by_type(cause_action_id, EdgeType.CAUSALITY)
+        in_degree = len(self.__causality_childs_of(cause_action_id))
         self.l.debug(f"cause action is node {cause_action_id}: {causing_action} with in-degree {in_degree}")
 
         # Complete the action which sent this message
@@ -1283,7 +1507,7 @@ class Orchestrator:
             self.l.info(f"  This completes the {type(causing_action).__name__} callback! Removing...")
             self.__remove_node(cause_action_id)
 
-        self.__process()
+        self.__schedule_process()
 
     def __diagnose_invalid_status(self, msg: Status) -> str:
         """
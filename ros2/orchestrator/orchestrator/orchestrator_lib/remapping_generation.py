@@ -12,12 +12,11 @@ from orchestrator.orchestrator_lib.name_utils import intercepted_name, normalize
 from orchestrator.orchestrator_lib.node_model import TopicInput, TimerInput, NodeModel
 
 
-def _find_node_model(name: str, models: List[NodeModel]) -> NodeModel:
-    for model in models:
-        if name == model.get_name():
-            return model
-
-    raise RuntimeError(f"No model for node with name {name}")
+def _find_node_model(name: str, models: Dict[str, NodeModel]) -> NodeModel:
+    model = models.get(name)
+    if model is None:
+        raise RuntimeError(f"No model for node with name {name}")
+    return model
 
 
 def _contains_timer_events(node: NodeModel):
@@ -50,6 +49,7 @@ def generate_remappings_from_config(launch_config: dict[str, Any]) -> List[SetRe
     :param launch_config: Deserialized launch config as dict
     """
     node_models = load_models(launch_config, load_node_config_schema())
+    node_models_by_name = {model.get_name(): model for model in node_models}
 
     remap_actions: list[SetRemap] = []
 
@@ -61,7 +61,8 @@ def generate_remappings_from_config(launch_config: dict[str, Any]) -> List[SetRe
                                " See https://github.com/ros2/rcl/issues/296, https://github.com/ros2/design/pull/299"
                                " and https://uulm-mrm.github.io/ros2_def/dev_docs/interception.html.")
         remappings: Dict[str, str] = node.get("remappings", {})
-        model = _find_node_model(node_name, node_models)
+        model = _find_node_model(node_name, node_models_by_name)
+        possible_inputs = frozenset(model.get_possible_inputs())
         for input in model.get_possible_inputs():
             if isinstance(input, TopicInput):
                 # Add identity remapping for input topics if no explicit remapping exists.
@@ -71,7 +72,7 @@ def generate_remappings_from_config(launch_config: dict[str, Any]) -> List[SetRe
 
         for internal_name, ros_name in remappings.items():
             ros_name = normalize_topic_name(ros_name)
-            if TopicInput(ros_name) not in model.get_possible_inputs():
+            if TopicInput(ros_name) not in possible_inputs:
                 continue
 
             remap_src = f"{node_name}:{internal_name}"
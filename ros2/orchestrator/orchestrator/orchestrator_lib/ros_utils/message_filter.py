@@ -1,14 +1,17 @@
 # pyright: strict
 
 from typing import Any, List, Mapping
-from threading import Lock
 from message_filters import SimpleFilter, ApproximateTimeSynchronizer
 
 
 class ApproximateTimeSynchronizerTracker:
     """
     This wraps an ApproximateTimeSynchronizer without requiring actual subscriptions,
-    and provides feedback wether the combined callback was executed or not
+    and provides feedback wether the combined callback was executed or not.
+
+    Not thread safe: Calls to test_input have to be serialized by the caller.
+    The orchestrator only calls it from its graph processing, which runs in the executor's callbacks of
+    the orchestrator node, one at a time.
     """
 
     def __init__(self, topic_names: List[str], queue_size: int, slop: float) -> None:
@@ -18,7 +21,6 @@ class ApproximateTimeSynchronizerTracker:
             self._filters[topic_name] = SimpleFilter()
         self._time_synchronizer = ApproximateTimeSynchronizer(self._filters.values(), queue_size, slop)
         self._was_called: bool = False
-        self._lock = Lock()
         self._time_synchronizer.registerCallback(self.__callback)
 
     def __callback(self, *_msgs: Any):
@@ -31,8 +33,6 @@ class ApproximateTimeSynchronizerTracker:
         Note that this modifies the internal state, and calling this should always
         happen in sync with actually publishing the message to the node
         """
-        with self._lock:
-            self._was_called = False
-            self._filters[topic_name].signalMessage(msg)
-            was_called: bool = self._was_called
-        return was_called
+        self._was_called = False
+        self._filters[topic_name].signalMessage(msg)
+        return self._was_called
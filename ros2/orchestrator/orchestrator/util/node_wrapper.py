@@ -1,3 +1,5 @@
+import functools
+
 from rclpy.publisher import Publisher
 from rclpy.node import Node
 from rclpy.subscription import Subscription
@@ -25,8 +27,8 @@ class OrchestratorWrapperNode:
     def create_subscription(self, topic_type: type, topic: str, callback: Callable[[Any], None], *args: Any,
                             **kwargs: Any) -> Subscription:
         self.callbacks[topic] = callback
-        callback = (lambda msg, topic=topic: self.handle(msg,
-                                                         topic)) if self.topics is None or topic in self.topics else callback
+        if self.topics is None or topic in self.topics:
+            callback = functools.partial(self.handle, topic=topic)
         return self.node.create_subscription(topic_type, topic, callback, *args,  # type: ignore
                                              **kwargs)
 
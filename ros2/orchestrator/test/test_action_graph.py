@@ -0,0 +1,102 @@
+import pytest
+
+from orchestrator.orchestrator_lib.action import EdgeType, OrchestratorBufferAction, OrchestratorStatusAction
+from orchestrator.orchestrator_lib.action_graph import ActionGraph
+from orchestrator.orchestrator_lib.node_model import TopicInput
+
+
+def graph_with_nodes(*nodes: int) -> ActionGraph:
+    graph = ActionGraph()
+    for node in nodes:
+        graph.add_node(node, OrchestratorStatusAction())
+    return graph
+
+
+def test_add_node():
+    graph = ActionGraph()
+    action = OrchestratorBufferAction(TopicInput("/a"))
+    graph.add_node(1, action)
+    assert len(graph) == 1
+    assert graph.actions[1] is action
+    assert graph.out_degree(1) == 0
+    assert list(graph.successors(1)) == []
+    assert list(graph.predecessors(1)) == []
+
+
+def test_add_duplicate_node():
+    graph = graph_with_nodes(1)
+    with pytest.raises(KeyError):
+        graph.add_node(1, OrchestratorStatusAction())
+
+
+def test_add_edge():
+    graph = graph_with_nodes(1, 2)
+    graph.add_edge(1, 2, EdgeType.CAUSALITY)
+    assert graph.has_edge(1, 2)
+    assert not graph.has_edge(2, 1)
+    assert graph.has_edge_of_type(1, 2, EdgeType.CAUSALITY)
+    assert not graph.has_edge_of_type(1, 2, EdgeType.SAME_NODE)
+    assert not graph.has_edge_of_type(2, 1, EdgeType.CAUSALITY)
+    assert list(graph.successors(1)) == [2]
+    assert list(graph.predecessors(2)) == [1]
+    assert graph.out_degree(1) == 1
+    assert graph.out_degree(2) == 0
+
+
+def test_multiple_edge_types():
+    graph = graph_with_nodes(1, 2)
+    graph.add_edge(1, 2, EdgeType.SAME_NODE)
+    graph.add_edge(1, 2, EdgeType.SERVICE_GROUP)
+    graph.add_edge(1, 2, EdgeType.SAME_NODE)
+    assert graph.edge_types(1, 2) == {EdgeType.SAME_NODE, EdgeType.SERVICE_GROUP}
+    assert graph.edge_types(2, 1) == set()
+    assert graph.has_edge_of_type(1, 2, EdgeType.SAME_NODE)
+    assert graph.has_edge_of_type(1, 2, EdgeType.SERVICE_GROUP)
+    assert not graph.has_edge_of_type(1, 2, EdgeType.CAUSALITY)
+    # Multiple types between the same nodes still count as a single successor
+    assert graph.out_degree(1) == 1
+    assert sorted(graph.edges(), key=lambda e: e[2].value) == [
+        (1, 2, EdgeType.SAME_NODE), (1, 2, EdgeType.SERVICE_GROUP)]
+
+
+def test_remove_node_returns_unconstrained_predecessors():
+    graph = graph_with_nodes(1, 2, 3, 4)
+    graph.add_edge(1, 4, EdgeType.CAUSALITY)
+    graph.add_edge(2, 4, EdgeType.SAME_NODE)
+    graph.add_edge(2, 4, EdgeType.SAME_TOPIC)
+    graph.add_edge(3, 4, EdgeType.SAME_NODE)
+    graph.add_edge(3, 1, EdgeType.SAME_NODE)
+
+    # 3 still has an edge to 1
+    assert sorted(graph.remove_node(4)) == [1, 2]
+    assert len(graph) == 3
+    assert 4 not in graph.actions
+    assert graph.out_degree(1) == 0
+    assert graph.out_degree(2) == 0
+    assert graph.out_degree(3) == 1
+
+    assert graph.remove_node(1) == [3]
+    assert graph.out_degree(3) == 0
+    assert list(graph.edges()) == []
+
+
+def test_remove_node_removes_outgoing_edges():
+    graph = graph_with_nodes(1, 2)
+    graph.add_edge(1, 2, EdgeType.CAUSALITY)
+    assert graph.remove_node(1) == []
+    assert list(graph.predecessors(2)) == []
+    assert not graph.edge_types(2, 2)
+
+
+def test_to_networkx():
+    nx = pytest.importorskip("networkx")
+    graph = graph_with_nodes(1, 2, 3)
+    graph.add_edge(1, 2, EdgeType.SAME_NODE)
+    graph.add_edge(1, 2, EdgeType.SERVICE_GROUP)
+    graph.add_edge(3, 1, EdgeType.CAUSALITY)
+
+    nx_graph = graph.to_networkx()
+    assert isinstance(nx_graph, nx.MultiDiGraph)
+    assert dict(nx_graph.nodes(data="data")) == graph.actions
+    assert sorted(nx_graph.edges(data="edge_type"), key=lambda e: (e[0], e[1], e[2].value)) == sorted(
+        graph.edges(), key=lambda e: (e[0], e[1], e[2].value))
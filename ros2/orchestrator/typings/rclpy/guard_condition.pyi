@@ -0,0 +1,9 @@
+"""
+This type stub file was generated by pyright.
+"""
+
+
+class GuardCondition:
+    def trigger(self) -> None:
+        """Trigger the guard condition, causing its callback to be executed by the executor."""
+        ...
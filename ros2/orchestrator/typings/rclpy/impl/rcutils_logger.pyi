@@ -2,8 +2,14 @@
 This type stub file was generated by pyright.
 """
 
+from rclpy.logging import LoggingSeverity
+
 
 class RcutilsLogger:
+    def is_enabled_for(self, severity: LoggingSeverity) -> bool:
+        """Check if the logger would output a message with the given severity."""
+        ...
+
     def debug(self, message: str) -> bool:
         """Log a message with `DEBUG` severity via :py:classmethod:RcutilsLogger.log:."""
         ...
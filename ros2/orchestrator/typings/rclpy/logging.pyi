@@ -0,0 +1,15 @@
+"""
+This type stub file was generated by pyright.
+"""
+
+from enum import IntEnum
+
+
+class LoggingSeverity(IntEnum):
+    """Enum for logging severity levels."""
+    UNSET = ...
+    DEBUG = ...
+    INFO = ...
+    WARN = ...
+    ERROR = ...
+    FATAL = ...
@@ -1,23 +1,36 @@
 #!/usr/bin/env python3
 
-import datetime
 import time
-from typing import Literal
+from enum import IntEnum
 
 import rclpy
 from rclpy.node import Node
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
 from rclpy.logging import get_logger
+from rclpy.qos import QoSProfile, QoSDurabilityPolicy, QoSReliabilityPolicy
+from rclpy.task import Future
 from rclpy.time import Time, Duration
 
 from orchestrator.orchestrator_lib.name_utils import intercepted_name
 from orchestrator.orchestrator_lib.orchestrator import Orchestrator
 from orchestrator.orchestrator_lib.model_loader import *
-from orchestrator.orchestrator_lib.ros_utils.spin import spin_for, spin_until
 
 from orchestrator_interfaces.msg import SampleMessage
 from rosgraph_msgs.msg import Clock
 
 
+class Mode(IntEnum):
+    TRACKING = 0
+    SERVICE = 1
+    TIME_SYNC = 2
+    DOUBLE_TIMER = 3
+    RECONFIGURATION = 4
+    VERIFICATION_1_DROP = 5
+    VERIFICATION_2_PARALLEL_INPUTS = 6
+    VERIFICATION_3_SAME_OUTPUT = 7
+    VERIFICATION_4_SERVICE = 8
+
+
 def l(msg):
     return get_logger("l").info(msg)
 
@@ -26,29 +39,59 @@ class BagPlayer(Node):
     def __init__(self) -> None:
         super().__init__("orchestrator")  # type: ignore
         self.get_logger().info(f"Orchestrator Node Starting!")
-        rclpy.get_global_executor().add_node(self)
+        self._executor = rclpy.get_global_executor()
+        self._executor.add_node(self)
 
         self.t = Time(seconds=1000000, nanoseconds=0)
+        # Tracking and time_sync advance by 100ms per tick, starting at a full second.
+        # Sensors publish once per second, i.e. whenever this counter wraps around.
+        self._tick_mod10 = 0
 
         self.declare_parameter('mode', '')
         mode = self.get_parameter('mode').get_parameter_value().string_value
 
-        self.mode: Literal["tracking", "service", "time_sync", "double_timer"]
         if mode == "tracking":
-            self.mode = "tracking"
+            self.mode = Mode.TRACKING
+            self._dt = Duration(seconds=0, nanoseconds=100_000_000)
+            self._period = 0.1
             launch_config = load_launch_config(
                 "orchestrator_dummy_nodes",
                 "tracking_example_launch_config.json",
                 load_launch_config_schema())
 
+            # Optionally publish the constant sensor messages only once, latched for late-joining subscribers.
+            # Off by default: every sensor message is an input which triggers the tracking pipeline.
+            self.declare_parameter('latch_sensor_inputs', False)
+            self._latch_sensor_inputs = self.get_parameter(
+                'latch_sensor_inputs').get_parameter_value().bool_value
+            self._sensors_published = False
+            if self._latch_sensor_inputs:
+                sensor_qos = QoSProfile(depth=1,
+                                        durability=QoSDurabilityPolicy.TRANSIENT_LOCAL,
+                                        reliability=QoSReliabilityPolicy.RELIABLE)
+            else:
+                sensor_qos = QoSProfile(depth=10)
+
             self.radar_publisher = self.create_publisher(
-                SampleMessage, "meas/radar", 10)
+                SampleMessage, "meas/radar", sensor_qos)
             self.camera_publisher = self.create_publisher(
-                SampleMessage, "meas/camera", 10)
+                SampleMessage, "meas/camera", sensor_qos)
             self.lidar_publisher = self.create_publisher(
-                SampleMessage, "meas/lidar", 10)
+                SampleMessage, "meas/lidar", sensor_qos)
+
+            # Sensor messages have constant content, build them once and republish
+            self._lidar_msg = SampleMessage(debug_data="lidar measurement")
+            self._radar_msg = SampleMessage(debug_data="radar measurement")
+            self._camera_msg = SampleMessage(debug_data="camera measurement")
+            self._sensor_inputs = (
+                ("meas/lidar", self.lidar_publisher, self._lidar_msg),
+                ("meas/radar", self.radar_publisher, self._radar_msg),
+                ("meas/camera", self.camera_publisher, self._camera_msg),
+            )
         elif mode == "service":
-            self.mode = "service"
+            self.mode = Mode.SERVICE
+            self._dt = Duration(seconds=3, nanoseconds=0)
+            self._period = 0.5
             self.input_publisher = self.create_publisher(
                 SampleMessage, "i", 10)
             launch_config = load_launch_config(
@@ -56,7 +99,9 @@ class BagPlayer(Node):
                 "service_test_launch_config.json",
                 load_launch_config_schema())
         elif mode == "time_sync":
-            self.mode = "time_sync"
+            self.mode = Mode.TIME_SYNC
+            self._dt = Duration(seconds=0, nanoseconds=100_000_000)
+            self._period = 0.3
             self.camera_info_publisher = self.create_publisher(
                 SampleMessage, "camera_info", 10)
             self.image_publisher = self.create_publisher(
@@ -67,14 +112,21 @@ class BagPlayer(Node):
                 load_launch_config_schema()
             )
         elif mode == "double_timer":
-            self.mode = "double_timer"
+            self.mode = Mode.DOUBLE_TIMER
+            self._dt = Duration(seconds=0, nanoseconds=50_000_000)
+            self._period = 1.0
             launch_config = load_launch_config(
                 "orchestrator_dummy_nodes",
                 "double_timer_test_launch_config.json",
                 load_launch_config_schema()
             )
         elif mode == "reconfiguration":
-            self.mode = "reconfiguration"
+            self.mode = Mode.RECONFIGURATION
+            self._dt = Duration(seconds=1, nanoseconds=0)
+            # Timesteps follow each other as fast as the orchestrator allows.
+            # Not 0, since a zero-period timer is always ready.
+            self._period = 0.01
+            self._t_end = Time(seconds=10)
             self.input_publisher = self.create_publisher(SampleMessage, "input", 10)
             launch_config = load_launch_config(
                 "orchestrator_dummy_nodes",
@@ -82,7 +134,9 @@ class BagPlayer(Node):
                 load_launch_config_schema())
             self.t = Time(seconds=0, nanoseconds=0)
         elif mode == "verification_1_drop":
-            self.mode = "verification_1_drop"
+            self.mode = Mode.VERIFICATION_1_DROP
+            self._dt = Duration(seconds=0, nanoseconds=200_000_000)
+            self._period = 0.2
             self.publisher = self.create_publisher(SampleMessage, "t", 10)
             self.i = 0
             launch_config = load_launch_config(
@@ -91,7 +145,9 @@ class BagPlayer(Node):
                 load_launch_config_schema())
             self.t = Time(seconds=0, nanoseconds=0)
         elif mode == "verification_2_parallel_inputs":
-            self.mode = "verification_2_parallel_inputs"
+            self.mode = Mode.VERIFICATION_2_PARALLEL_INPUTS
+            self._dt = Duration(seconds=1, nanoseconds=0)
+            self._period = 1.0
             self.publisher = self.create_publisher(SampleMessage, "M", 10)
             self.i = 0
             launch_config = load_launch_config(
@@ -101,7 +157,9 @@ class BagPlayer(Node):
             self.t = Time(seconds=0, nanoseconds=0)
             self.last_publish = None
         elif mode == "verification_3_same_output":
-            self.mode = "verification_3_same_output"
+            self.mode = Mode.VERIFICATION_3_SAME_OUTPUT
+            self._dt = Duration(seconds=1, nanoseconds=0)
+            self._period = 1.0
             self.publisher = self.create_publisher(SampleMessage, "M", 10)
             self.i = 0
             launch_config = load_launch_config(
@@ -111,7 +169,9 @@ class BagPlayer(Node):
             self.t = Time(seconds=0, nanoseconds=0)
             self.last_publish = None
         elif mode == "verification_4_service":
-            self.mode = "verification_3_same_output"
+            self.mode = Mode.VERIFICATION_4_SERVICE
+            self._dt = Duration(seconds=1, nanoseconds=0)
+            self._period = 1.0
             self.publisher = self.create_publisher(SampleMessage, "T", 10)
             self.i = 0
             launch_config = load_launch_config(
@@ -124,185 +184,182 @@ class BagPlayer(Node):
             self.get_logger().fatal(f"Unknown mode: {mode}")
             exit(1)
 
-        self.get_logger().info(f"Mode is {self.mode}")
+        self.get_logger().info(f"Mode is {self.mode.name}")
+
+        # Timestep implementation for each mode, indexed by mode value
+        self._timestep_table = (
+            self.timestep_tracking,
+            self.timestep_service,
+            self.timestep_time_sync,
+            self.timestep_double_timer,
+            self.timestep_reconfiguration,
+            self.timestep_verification_1_drop,
+            self.timestep_verification_2_parallel_inputs,
+            self.timestep_verification_2_parallel_inputs,
+            self.timestep_verification_2_parallel_inputs,
+        )
+        self._timestep_impl = self._timestep_table[self.mode]
 
         self.clock_publisher = self.create_publisher(Clock, "clock", 10)
+        self._clock_msg = Clock()
 
         node_config = load_models(launch_config, load_node_config_schema())
 
         self.orchestrator = Orchestrator(
             self,
-            rclpy.get_global_executor(),
+            self._executor,
             node_config,
             logger=get_logger("l"))
         self.orchestrator.initialize_ros_communication()
 
+        # Timesteps are coroutines awaiting the orchestrator. They are driven by a timer with its own callback group,
+        # so that the orchestrator callbacks can run while a timestep is waiting.
+        self._timestep_timer = self.create_timer(self._period, self._timestep_impl,
+                                                 callback_group=MutuallyExclusiveCallbackGroup())
+
     def publish_lidar(self):
-        msg = SampleMessage()
-        msg.debug_data = "lidar measurement"
-        self.lidar_publisher.publish(msg)
+        self.lidar_publisher.publish(self._lidar_msg)
 
     def publish_radar(self):
-        msg = SampleMessage()
-        msg.debug_data = "radar measurement"
-        self.radar_publisher.publish(msg)
+        self.radar_publisher.publish(self._radar_msg)
 
     def publish_camera(self):
-        msg = SampleMessage()
-        msg.debug_data = "camera measurement"
-        self.camera_publisher.publish(msg)
-
-    def publish_time(self):
-        msg = Clock()
-        msg.clock = self.t.to_msg()
-        self.clock_publisher.publish(msg)
-
-    def timestep_service(self):
-
-        f = self.orchestrator.wait_until_time_publish_allowed(self.t)
-        rclpy.get_global_executor().spin_until_future_complete(f)
+        self.camera_publisher.publish(self._camera_msg)
+
+    def publish_time(self, stamp=None):
+        """Publish the current time, optionally using the already converted stamp of self.t"""
+        if stamp is None:
+            stamp = self.t.to_msg()
+        self._clock_msg.clock = stamp
+        self.clock_publisher.publish(self._clock_msg)
+
+    async def _sleep_until(self, deadline: float):
+        """Wait until the given time.monotonic() deadline, without blocking the executor"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        future = Future()
+
+        def wake():
+            timer.cancel()
+            future.set_result(None)
+
+        timer = self.create_timer(remaining, wake)
+        await future
+        self.destroy_timer(timer)
+
+    async def _publish_after(self, topic: str, publisher, msg):
+        await self.orchestrator.wait_until_publish_allowed(topic)
+        publisher.publish(msg)
+
+    async def _publish_all_after(self, inputs):
+        """
+        Publish a batch of (topic, publisher, message) inputs, each once allowed by the orchestrator.
+
+        The orchestrator only accepts one offered input at a time, so the waits happen in order,
+        but the whole batch completes within a single task.
+        """
+        for topic, publisher, msg in inputs:
+            await self._publish_after(topic, publisher, msg)
+
+    async def timestep_service(self):
+        await self.orchestrator.wait_until_time_publish_allowed(self.t)
         self.get_logger().info(f"Timestep {self.t}!")
         self.publish_time()
 
-        f = self.orchestrator.wait_until_publish_allowed("i")
-        rclpy.get_global_executor().spin_until_future_complete(f)
-        msg = SampleMessage()
-        self.input_publisher.publish(msg)
+        await self._publish_after("i", self.input_publisher, SampleMessage())
 
-        spin_for(rclpy.get_global_executor(), datetime.timedelta(seconds=0.5))
-        self.t += Duration(seconds=3, nanoseconds=0)
+        self.t += self._dt
 
-    def timestep_tracking(self):
-        f = self.orchestrator.wait_until_time_publish_allowed(self.t)
-        rclpy.get_global_executor().spin_until_future_complete(f)
+    async def timestep_tracking(self):
+        await self.orchestrator.wait_until_time_publish_allowed(self.t)
         self.get_logger().info(f"Timestep {self.t}!")
         self.publish_time()
 
-        if self.t.nanoseconds % 10 ** 9 == 0:
+        if self._tick_mod10 == 0 and not (self._latch_sensor_inputs and self._sensors_published):
             # Publish sensors once per second
-            f = self.orchestrator.wait_until_publish_allowed("meas/lidar")
-            rclpy.get_global_executor().spin_until_future_complete(f)
-            self.publish_lidar()
-
-            f = self.orchestrator.wait_until_publish_allowed("meas/radar")
-            rclpy.get_global_executor().spin_until_future_complete(f)
-            self.publish_radar()
+            await self._publish_all_after(self._sensor_inputs)
+            self._sensors_published = True
 
-            f = self.orchestrator.wait_until_publish_allowed("meas/camera")
-            rclpy.get_global_executor().spin_until_future_complete(f)
-            self.publish_camera()
+        self.t += self._dt
+        self._tick_mod10 = (self._tick_mod10 + 1) % 10
 
-        spin_for(rclpy.get_global_executor(), datetime.timedelta(seconds=0.1))
-        self.t += Duration(seconds=0, nanoseconds=100_000_000)
-
-    def timestep_time_sync(self):
-        f = self.orchestrator.wait_until_time_publish_allowed(self.t)
-        rclpy.get_global_executor().spin_until_future_complete(f)
-        self.publish_time()
+    async def timestep_time_sync(self):
+        await self.orchestrator.wait_until_time_publish_allowed(self.t)
+        stamp = self.t.to_msg()
+        self.publish_time(stamp)
 
         ci_msg = SampleMessage()
-        ci_msg.header.stamp = self.t.to_msg()
-        f = self.orchestrator.wait_until_publish_allowed("camera_info")
-        rclpy.get_global_executor().spin_until_future_complete(f)
-        self.camera_info_publisher.publish(ci_msg)
+        ci_msg.header.stamp = stamp
+        await self._publish_after("camera_info", self.camera_info_publisher, ci_msg)
 
-        if self.t.nanoseconds % 10 ** 9 == 0:
+        if self._tick_mod10 == 0:
             image_msg = SampleMessage()
-            image_msg.header.stamp = self.t.to_msg()
-            f = self.orchestrator.wait_until_publish_allowed("image")
-            rclpy.get_global_executor().spin_until_future_complete(f)
-            self.image_publisher.publish(image_msg)
+            image_msg.header.stamp = stamp
+            await self._publish_after("image", self.image_publisher, image_msg)
 
-        spin_for(rclpy.get_global_executor(), datetime.timedelta(seconds=0.3))
-        self.t += Duration(seconds=0, nanoseconds=100_000_000)
+        self.t += self._dt
+        self._tick_mod10 = (self._tick_mod10 + 1) % 10
 
-    def timestep_double_timer(self):
-        f = self.orchestrator.wait_until_time_publish_allowed(self.t)
-        rclpy.get_global_executor().spin_until_future_complete(f)
+    async def timestep_double_timer(self):
+        await self.orchestrator.wait_until_time_publish_allowed(self.t)
         self.publish_time()
-        spin_for(rclpy.get_global_executor(), datetime.timedelta(seconds=1.0))
-        self.t += Duration(seconds=0, nanoseconds=50000000)
+        self.t += self._dt
 
-    def timestep_reconfiguration(self):
-        f = self.orchestrator.wait_until_time_publish_allowed(self.t)
-        rclpy.get_global_executor().spin_until_future_complete(f)
-        self.publish_time()
-        if self.t == Time(seconds=10):
+    async def timestep_reconfiguration(self):
+        await self.orchestrator.wait_until_time_publish_allowed(self.t)
+        stamp = self.t.to_msg()
+        self.publish_time(stamp)
+        if self.t == self._t_end:
             exit(0)
         else:
-            f = self.orchestrator.wait_until_publish_allowed("input")
-            rclpy.get_global_executor().spin_until_future_complete(f)
             msg = SampleMessage()
             msg.debug_data = "input"
-            msg.header.stamp = self.t.to_msg()
-            self.input_publisher.publish(msg)
+            msg.header.stamp = stamp
+            await self._publish_after("input", self.input_publisher, msg)
 
-        # spin_for(rclpy.get_global_executor(), datetime.timedelta(seconds=1.0))
-        self.t += Duration(seconds=1, nanoseconds=0)
-        pass
+        self.t += self._dt
 
-    def timestep_verification_1_drop(self):
-        f = self.orchestrator.wait_until_time_publish_allowed(self.t)
-        rclpy.get_global_executor().spin_until_future_complete(f)
-        self.publish_time()
+    async def timestep_verification_1_drop(self):
+        await self.orchestrator.wait_until_time_publish_allowed(self.t)
+        stamp = self.t.to_msg()
+        self.publish_time(stamp)
 
         msg = SampleMessage()
         msg.debug_data = "input " + str(self.i)
-        msg.header.stamp = self.t.to_msg()
-        f = self.orchestrator.wait_until_publish_allowed(self.publisher.topic_name)
-        rclpy.get_global_executor().spin_until_future_complete(f)
+        msg.header.stamp = stamp
+        await self.orchestrator.wait_until_publish_allowed(self.publisher.topic_name)
         self.get_logger().info(f"Publishing message {self.i}")
         self.publisher.publish(msg)
-        self.t += Duration(seconds=0, nanoseconds=200_000_000)
+        self.t += self._dt
         self.i += 1
-        spin_for(rclpy.get_global_executor(), datetime.timedelta(seconds=0.2))
 
-    def timestep_verification_2_parallel_inputs(self):
-        f = self.orchestrator.wait_until_time_publish_allowed(self.t)
-        rclpy.get_global_executor().spin_until_future_complete(f)
-        self.publish_time()
+    async def timestep_verification_2_parallel_inputs(self):
+        await self.orchestrator.wait_until_time_publish_allowed(self.t)
+        stamp = self.t.to_msg()
+        self.publish_time(stamp)
 
         msg = SampleMessage()
         msg.debug_data = "input " + str(self.i)
-        msg.header.stamp = self.t.to_msg()
-        f = self.orchestrator.wait_until_publish_allowed(self.publisher.topic_name)
-        rclpy.get_global_executor().spin_until_future_complete(f)
+        msg.header.stamp = stamp
+        await self.orchestrator.wait_until_publish_allowed(self.publisher.topic_name)
+        # The timer period does not bound the time between publishes, since waiting for the orchestrator takes
+        # varying time within each timestep.
         if self.last_publish is not None:
-            spin_until(rclpy.get_global_executor(), self.last_publish + datetime.timedelta(seconds=1.0))
-        self.last_publish = datetime.datetime.now()
+            await self._sleep_until(self.last_publish + 1.0)
+        self.last_publish = time.monotonic()
         self.get_logger().info(f"Publishing message {self.i}")
         self.publisher.publish(msg)
-        self.t += Duration(seconds=1, nanoseconds=0)
+        self.t += self._dt
         self.i += 1
 
-    def timestep(self):
-        if self.mode == "tracking":
-            self.timestep_tracking()
-        elif self.mode == "service":
-            self.timestep_service()
-        elif self.mode == "time_sync":
-            self.timestep_time_sync()
-        elif self.mode == "double_timer":
-            self.timestep_double_timer()
-        elif self.mode == "reconfiguration":
-            self.timestep_reconfiguration()
-        elif self.mode == "verification_1_drop":
-            self.timestep_verification_1_drop()
-        elif self.mode == "verification_2_parallel_inputs" \
-                or self.mode == "verification_3_same_output" \
-                or self.mode == "verification_4_service":
-            self.timestep_verification_2_parallel_inputs()
-        else:
-            raise RuntimeError()
-
 
 def main():
     rclpy.init()
     orchestrator = BagPlayer()
 
     try:
-        while True:
-            orchestrator.timestep()
+        rclpy.spin(orchestrator)
     except KeyboardInterrupt:
         pass
     orchestrator.orchestrator.dump_state_sequence()
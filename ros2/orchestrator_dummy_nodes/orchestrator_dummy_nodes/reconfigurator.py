@@ -75,13 +75,15 @@ class ReconfiguratorNode(Node):
         req = SetConfigurationService.Request()
         req.config_value = "T2"
         resp_a = self.configure_a_client.call(req)
-        assert resp_a.success
+        if not resp_a.success:
+            raise RuntimeError("Reconfiguration of A failed")
 
         self.get_logger().info("Reconfiguring B...")
         req_b = SetConfigurationService.Request()
         req_b.config_value = intercepted_name("B", "T2")
         resp_b = self.configure_b_client.call(req_b)
-        assert resp_b.success
+        if not resp_b.success:
+            raise RuntimeError("Reconfiguration of B failed")
 
         self.get_logger().info("Reconfiguration done. Replying to orchestrator.")
         response.new_launch_config_package = "orchestrator_dummy_nodes"
@@ -1,22 +1,48 @@
 #!/usr/bin/env python3
-import random
+import sys
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
 import rosbag2_py
 from numpy.random import default_rng
 
 
-def create_reader(uri: str, storage_identifier: str) -> (rosbag2_py.SequentialReader, rosbag2_py.ConverterOptions):
+def create_reader(uri: str, storage_identifier: str, topics: Optional[List[str]] = None) -> Tuple[
+        rosbag2_py.SequentialReader, rosbag2_py.ConverterOptions]:
     reader = rosbag2_py.SequentialReader()
     storage_options = rosbag2_py.StorageOptions(uri, storage_id=storage_identifier)
     serialization_format = "cdr"
     converter_options = rosbag2_py.ConverterOptions(serialization_format, serialization_format)
     reader.open(storage_options, converter_options)
+    if topics is not None:
+        # Messages on other topics are skipped by the storage plugin and never reach python
+        reader.set_filter(rosbag2_py.StorageFilter(topics=topics))
     return reader, converter_options
 
 
+# rosbag2_storage_mcap writer options: zstd-compressed 4MiB chunks
+MCAP_STORAGE_CONFIG = """\
+chunkSize: 4194304
+compression: Zstd
+compressionLevel: Fastest
+"""
+
+
 def create_writer(uri: str, converter_options: rosbag2_py.ConverterOptions, storage_identifier: str):
     writer = rosbag2_py.SequentialWriter()
-    storage_options = rosbag2_py.StorageOptions(uri, storage_id=storage_identifier)
-    writer.open(storage_options, converter_options)
+    # The storage config is only read when opening the writer
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml") as storage_config:
+        storage_config_uri = ""
+        if storage_identifier == "mcap":
+            storage_config.write(MCAP_STORAGE_CONFIG)
+            storage_config.flush()
+            storage_config_uri = storage_config.name
+        # Large write cache, large chunks and 1GiB bag files, to reduce the number of write calls
+        storage_options = rosbag2_py.StorageOptions(
+            uri, storage_id=storage_identifier, max_bagfile_size=1 << 30, max_cache_size=256 * 1024 * 1024,
+            storage_config_uri=storage_config_uri)
+        writer.open(storage_options, converter_options)
     return writer
 
 
@@ -26,19 +52,46 @@ def main():
     timestamp_stddev_ns = 600000
     timestamp_max_offset_ns = 2000000
     zero_time = 1000000000000000000
+    # MCAP is considerably faster to write than sqlite3
+    output_storage_identifier = "mcap"
+    # Topics to copy to the output bag are given as command line arguments, no arguments keeps all topics
+    keep_topics: Optional[List[str]] = sys.argv[1:] or None
     assert (timestamp_max_offset_ns >= 0)
     rng = default_rng(20230523)
+    # Separate, unseeded generator for prune decisions, so the timestamp offsets are drawn from rng as before
+    prune_rng = default_rng()
+    # Prune decisions are drawn in batches instead of one PRNG call per message
+    prune_sample_batch_size = 1 << 16
+    # Integer samples in [0, 2^16), a message is pruned if its sample is below the threshold
+    prune_threshold = int(prune_probability * 65536)
 
     metadata: rosbag2_py.BagMetadata = rosbag2_py.Info().read_metadata(bag_uri, "")
-    reader, converter_options = create_reader(bag_uri, metadata.storage_identifier)
-    writer = create_writer(bag_uri + "_drop_reorder", converter_options, metadata.storage_identifier)
+    reader, converter_options = create_reader(bag_uri, metadata.storage_identifier, keep_topics)
+    writer = create_writer(bag_uri + "_drop_reorder", converter_options, output_storage_identifier)
 
     for topic_metadata in reader.get_all_topics_and_types():
-        writer.create_topic(topic_metadata)
+        if keep_topics is None or topic_metadata.name in keep_topics:
+            writer.create_topic(topic_metadata)
+
+    # Bind methods used per message to local names, avoiding attribute lookups in the loop
+    has_next = reader.has_next
+    read_next = reader.read_next
+    write = writer.write
+    integers = prune_rng.integers
+    normal = rng.normal
+
+    # Converted to a list, indexing yields plain python ints instead of numpy scalars
+    prune_samples = integers(0, 65536, size=prune_sample_batch_size, dtype=np.uint16).tolist()
+    prune_sample_index = 0
 
-    while reader.has_next():
-        topic_name, serialized_data, time_stamp_ns = reader.read_next()
-        if random.random() <= prune_probability:
+    while has_next():
+        topic_name, serialized_data, time_stamp_ns = read_next()
+        if prune_sample_index == prune_sample_batch_size:
+            prune_samples = integers(0, 65536, size=prune_sample_batch_size, dtype=np.uint16).tolist()
+            prune_sample_index = 0
+        prune = prune_samples[prune_sample_index] < prune_threshold
+        prune_sample_index += 1
+        if prune:
             continue
 
         if time_stamp_ns == 0:
@@ -46,9 +99,9 @@ def main():
 
         time_offset = max(-timestamp_max_offset_ns,
                           min(timestamp_max_offset_ns,
-                              int(rng.normal(scale=timestamp_stddev_ns))))
+                              int(normal(scale=timestamp_stddev_ns))))
 
-        writer.write(topic_name, serialized_data, time_stamp_ns + time_offset)
+        write(topic_name, serialized_data, time_stamp_ns + time_offset)
 
 
 if __name__ == '__main__':
@@ -71,7 +71,8 @@ class ReconfiguratorNode(Node):
         self.get_logger().info("Reconfiguring SIL...")
         req = SetConfigurationService.Request()
         resp_a = self.sil_config_client.call(req)
-        assert resp_a.success
+        if not resp_a.success:
+            raise RuntimeError("Reconfiguration of SIL failed")
 
         self.get_logger().info("Reconfiguration done. Replying to orchestrator.")
         response.new_launch_config_package = "platform_sil"